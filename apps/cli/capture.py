@@ -39,10 +39,12 @@ DEFAULT_NEON_DSN_ENV = "NEON_DATABASE_URL"
 DEFAULT_NEON_CONNECT_TIMEOUT_S = 15
 
 
+# uuid7 is available in recent Python; fallback keeps portability.
+_ID_FN = getattr(uuid, "uuid7", uuid.uuid4)
+
+
 def _new_id() -> str:
-    if hasattr(uuid, "uuid7"):
-        return str(uuid.uuid7())  # type: ignore[attr-defined]
-    return str(uuid.uuid4())
+    return str(_ID_FN())
 
 
 def normalize_text(text: str) -> str:
@@ -279,7 +281,8 @@ def insert_capture_neon(
 
 
 def run_sqlite(args: argparse.Namespace, raw_text: str, input_type: str, pii_score: float) -> tuple[str, str, bool]:
-    conn = sqlite3.connect(args.db)
+    # "file:" URIs allow shared in-memory databases (file:name?mode=memory&cache=shared)
+    conn = sqlite3.connect(args.db, uri=args.db.startswith("file:"))
     conn.row_factory = sqlite3.Row
     try:
         source_id, source_created = resolve_source_id_sqlite(conn, args)
@@ -378,7 +381,7 @@ def build_parser() -> argparse.ArgumentParser:
         default="sqlite",
         help="Storage backend",
     )
-    parser.add_argument("--db", help="SQLite database path (for --backend sqlite)")
+    parser.add_argument("--db", help="SQLite database path or file: URI (for --backend sqlite)")
     parser.add_argument("--neon-dsn", help="Neon PostgreSQL DSN (for --backend neon)")
     parser.add_argument(
         "--neon-dsn-env",
@@ -422,9 +425,9 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if args.backend == "sqlite" and not args.db:
         parser.error("--db is required when --backend sqlite")
     return run(args)
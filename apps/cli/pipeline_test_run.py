@@ -13,6 +13,7 @@ By default this command leaves no DB behind.
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import sqlite3
 import subprocess
@@ -44,8 +45,13 @@ def _read_text(args: argparse.Namespace) -> str:
     return text
 
 
+@functools.lru_cache(maxsize=1)
+def _schema_text() -> str:
+    return SCHEMA_SQL.read_text(encoding="utf-8")
+
+
 def _init_sqlite(db_path: Path) -> None:
-    schema = SCHEMA_SQL.read_text(encoding="utf-8")
+    schema = _schema_text()
     conn = sqlite3.connect(db_path)
     try:
         conn.executescript(schema)
@@ -259,8 +265,8 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main() -> int:
-    args = build_parser().parse_args()
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
     return run(args)
 
 
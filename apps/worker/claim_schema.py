@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
 from typing import Any
 
@@ -119,6 +120,35 @@ def claims_response_schema() -> dict[str, Any]:
     }
 
 
+def missing_required_properties(node: Any, out: list[str] | None = None) -> list[str]:
+    # strict structured output needs every property listed in `required`
+    if out is None:
+        out = []
+    if not isinstance(node, dict):
+        return out
+    properties = node.get("properties")
+    if node.get("type") == "object" and isinstance(properties, dict) and properties:
+        required = node.get("required")
+        if isinstance(required, list):
+            out.extend(key for key in properties.keys() if key not in required)
+
+    if isinstance(properties, dict):
+        for value in properties.values():
+            missing_required_properties(value, out)
+    missing_required_properties(node.get("items"), out)
+    return out
+
+
+# the schema is static, so the walk runs once, on first use rather than at import
+@functools.lru_cache(maxsize=1)
+def _strict_required_errors() -> tuple[str, ...]:
+    return tuple(missing_required_properties(claims_response_schema()))
+
+
+def strict_required_errors() -> list[str]:
+    return list(_strict_required_errors())
+
+
 @dataclass(frozen=True)
 class ParsedEvidenceSpan:
     char_start: int | None
@@ -3,9 +3,12 @@
 
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
 from typing import Any
 
+from claim_schema import missing_required_properties
+
 
 SUPPORTED_MODALITIES = {"fact", "plan", "hypothesis", "request", "feeling"}
 SUPPORTED_POLARITIES = {"affirm", "negate"}
@@ -153,6 +156,15 @@ def claims_response_schema() -> dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=1)
+def _strict_required_errors() -> tuple[str, ...]:
+    return tuple(missing_required_properties(claims_response_schema()))
+
+
+def strict_required_errors() -> list[str]:
+    return list(_strict_required_errors())
+
+
 @dataclass(frozen=True)
 class ParsedEvidenceSpan:
     char_start: int | None
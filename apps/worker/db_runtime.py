@@ -3,9 +3,10 @@
 
 from __future__ import annotations
 
+import contextlib
 import os
 import sqlite3
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator, Sequence
 
 
 DEFAULT_NEON_DSN_ENV = "NEON_DATABASE_URL"
@@ -49,7 +50,8 @@ def open_connection(
     if backend == "sqlite":
         if not db:
             raise SystemExit("--db is required when --backend sqlite")
-        conn = sqlite3.connect(db)
+        # "file:" URIs allow shared in-memory databases (file:name?mode=memory&cache=shared)
+        conn = sqlite3.connect(db, uri=db.startswith("file:"))
         conn.row_factory = sqlite3.Row
         return conn
 
@@ -80,23 +82,95 @@ def fetch_all(conn: Any, query: str, params: Iterable[Any] = ()) -> list[Any]:
         return list(cur.fetchall())
 
 
-def fetch_one(conn: Any, query: str, params: Iterable[Any] = ()) -> Any | None:
+def iter_all(
+    conn: Any,
+    query: str,
+    params: Iterable[Any] = (),
+    *,
+    cursor_name: str,
+    itersize: int = 100,
+) -> Iterator[Any]:
+    if is_sqlite_conn(conn):
+        yield from conn.execute(_adapt_sqlite_query(query), tuple(params))
+        return
+    # server-side cursor: rows are pulled `itersize` at a time instead of all at once
+    with conn.cursor(name=cursor_name) as cur:
+        cur.itersize = itersize
+        cur.execute(query, tuple(params))
+        yield from cur
+
+
+def fetch_one(
+    conn: Any,
+    query: str,
+    params: Iterable[Any] = (),
+    *,
+    prepare: bool | None = None,
+) -> Any | None:
     if is_sqlite_conn(conn):
         return conn.execute(_adapt_sqlite_query(query), tuple(params)).fetchone()
     with conn.cursor() as cur:
-        cur.execute(query, tuple(params))
+        cur.execute(query, tuple(params), prepare=prepare)
         return cur.fetchone()
 
 
-def exec_write(conn: Any, query: str, params: Iterable[Any] = ()) -> int:
+def exec_write(
+    conn: Any,
+    query: str,
+    params: Iterable[Any] = (),
+    *,
+    prepare: bool | None = None,
+) -> int:
+    # `prepare` is forwarded to psycopg; sqlite3 already caches compiled statements by SQL text.
     if is_sqlite_conn(conn):
         cur = conn.execute(_adapt_sqlite_query(query), tuple(params))
         return cur.rowcount
     with conn.cursor() as cur:
-        cur.execute(query, tuple(params))
+        cur.execute(query, tuple(params), prepare=prepare)
         return cur.rowcount
 
 
+@contextlib.contextmanager
+def savepoint(conn: Any, name: str) -> Iterator[None]:
+    # PostgreSQL aborts the whole transaction on any failed statement; rolling back to a
+    # savepoint keeps it (and cursors opened before it) usable. sqlite needs nothing here.
+    if is_sqlite_conn(conn):
+        yield
+        return
+    exec_write(conn, f"SAVEPOINT {name}")
+    try:
+        yield
+    except Exception:
+        exec_write(conn, f"ROLLBACK TO SAVEPOINT {name}")
+        raise
+    exec_write(conn, f"RELEASE SAVEPOINT {name}")
+
+
+def exec_many(conn: Any, query: str, rows: Iterable[Sequence[Any]]) -> None:
+    if is_sqlite_conn(conn):
+        conn.executemany(_adapt_sqlite_query(query), [tuple(r) for r in rows])
+        return
+    with conn.cursor() as cur:
+        cur.executemany(query, [tuple(r) for r in rows])
+
+
+def copy_to_temp_table(
+    conn: Any,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> None:
+    # PostgreSQL only: text-typed TEMP table, dropped at commit
+    if is_sqlite_conn(conn):
+        raise ValueError("copy_to_temp_table requires a PostgreSQL connection")
+    column_defs = ", ".join(f"{col} text" for col in columns)
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE TEMP TABLE {table} ({column_defs}) ON COMMIT DROP")
+        with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
 def now_expr(conn: Any) -> str:
     if is_sqlite_conn(conn):
         return "datetime('now')"
@@ -100,10 +100,12 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+# uuid7 is available in recent Python; fallback keeps portability.
+_ID_FN = getattr(uuid, "uuid7", uuid.uuid4)
+
+
 def _new_id() -> str:
-    if hasattr(uuid, "uuid7"):
-        return str(uuid.uuid7())  # type: ignore[attr-defined]
-    return str(uuid.uuid4())
+    return str(_ID_FN())
 
 
 def _normalize_alias(value: str) -> str:
@@ -33,7 +33,13 @@ from db_runtime import (
 )
 from japanese_nlp import MorphToken, tokenize_with_lemma
 from json_contract import validate_contract, worker_schema_path
-from rule_lexicon import OBJECT_STOP_LEMMAS, PREDICATE_LEMMA_HINTS
+from rule_lexicon import (
+    NORMALIZED_PREDICATE_HINTS,
+    OBJECT_STOP_LEMMAS,
+    PREDICATE_PRIORITY,
+    lemma_predicate,
+    normalize_for_match,
+)
 
 
 EXTRACTOR_VERSION_RULES = "rules-v1"
@@ -273,11 +279,12 @@ class Fact:
         return (self.subject.strip(), self.predicate.strip(), self.object_text.strip())
 
 
+# uuid7 is available in recent Python; fallback keeps portability.
+_ID_FN = getattr(uuid, "uuid7", uuid.uuid4)
+
+
 def _new_id() -> str:
-    # uuid7 is available in recent Python; fallback keeps portability.
-    if hasattr(uuid, "uuid7"):
-        return str(uuid.uuid7())  # type: ignore[attr-defined]
-    return str(uuid.uuid4())
+    return str(_ID_FN())
 
 
 def split_sentences(text: str) -> list[str]:
@@ -296,7 +303,7 @@ def split_sentences(text: str) -> list[str]:
 
 
 def _norm_lemma(value: str) -> str:
-    return value.strip().lower()
+    return normalize_for_match(value)
 
 
 def _object_type_and_json(predicate: str, object_text: str) -> tuple[str, str | None]:
@@ -322,7 +329,7 @@ def _extract_object_text(sentence: str, predicate: str, tokens: list[MorphToken]
     if not tokens:
         return clamp_text(sentence, 1000)
 
-    hints = {_norm_lemma(v) for v in PREDICATE_LEMMA_HINTS.get(predicate, set())}
+    hints = NORMALIZED_PREDICATE_HINTS.get(predicate, frozenset())
     predicate_idx = -1
     for idx, tok in enumerate(tokens):
         if _norm_lemma(tok.lemma) in hints:
@@ -360,10 +367,10 @@ def detect_predicate(sentence: str, *, tokens: list[MorphToken] | None = None) -
             return predicate, 0.82
 
     token_list = tokens if tokens is not None else tokenize_with_lemma(sentence)
-    lemma_set = {_norm_lemma(tok.lemma) for tok in token_list if _norm_lemma(tok.lemma)}
-    for predicate, hints in PREDICATE_LEMMA_HINTS.items():
-        if lemma_set.intersection({_norm_lemma(v) for v in hints}):
-            return predicate, 0.79
+    hits = {lemma_predicate(tok.lemma) for tok in token_list}
+    hits.discard(None)
+    if hits:
+        return min(hits, key=PREDICATE_PRIORITY.__getitem__), 0.79
     return "mentions", 0.72
 
 
@@ -395,7 +402,12 @@ def make_meta_fact(
     )
 
 
-def extract_from_note_rules(row: RowLike, max_facts: int) -> list[Fact]:
+def extract_from_note_rules(
+    row: RowLike,
+    max_facts: int,
+    *,
+    predicate_filter: str | None = None,
+) -> list[Fact]:
     note_id = row["id"]
     note_type = row["note_type"]
     occurred_at = row["occurred_at"]
@@ -466,32 +478,44 @@ def extract_from_note_rules(row: RowLike, max_facts: int) -> list[Fact]:
             )
         )
 
+    # facts for other predicates still count toward max_facts so filtering never changes which facts survive
+    produced = len(facts)
+    if predicate_filter is not None:
+        facts = [fact for fact in facts if fact.predicate == predicate_filter]
+
     text = "\n".join([title, summary, body]).strip()
     sentences = split_sentences(text)
     for sentence in sentences:
         tokens = tokenize_with_lemma(sentence)
         predicate, confidence = detect_predicate(sentence, tokens=tokens)
-        object_text = _extract_object_text(sentence, predicate, tokens)
-        object_type, object_json = _object_type_and_json(predicate, object_text)
-        facts.append(
-            Fact(
-                subject=subject,
-                predicate=predicate,
-                object_text=object_text,
-                object_type=object_type,
-                object_json=object_json,
-                evidence_excerpt=clamp_text(sentence, 350),
-                occurred_at=occurred_at,
-                confidence=confidence,
+        produced += 1
+        if predicate_filter is None or predicate == predicate_filter:
+            object_text = _extract_object_text(sentence, predicate, tokens)
+            object_type, object_json = _object_type_and_json(predicate, object_text)
+            facts.append(
+                Fact(
+                    subject=subject,
+                    predicate=predicate,
+                    object_text=object_text,
+                    object_type=object_type,
+                    object_json=object_json,
+                    evidence_excerpt=clamp_text(sentence, 350),
+                    occurred_at=occurred_at,
+                    confidence=confidence,
+                )
             )
-        )
-        if len(facts) >= max_facts:
+        if produced >= max_facts:
             break
 
     return dedupe_facts(facts, max_facts=max_facts)
 
 
-def extract_from_task_rules(row: RowLike, max_facts: int) -> list[Fact]:
+def extract_from_task_rules(
+    row: RowLike,
+    max_facts: int,
+    *,
+    predicate_filter: str | None = None,
+) -> list[Fact]:
     task_id = row["id"]
     title = row["title"] or ""
     details = row["details"] or ""
@@ -558,6 +582,10 @@ def extract_from_task_rules(row: RowLike, max_facts: int) -> list[Fact]:
             )
         )
 
+    produced = len(facts)
+    if predicate_filter is not None:
+        facts = [fact for fact in facts if fact.predicate == predicate_filter]
+
     text = "\n".join([title, details]).strip()
     for sentence in split_sentences(text):
         tokens = tokenize_with_lemma(sentence)
@@ -565,20 +593,22 @@ def extract_from_task_rules(row: RowLike, max_facts: int) -> list[Fact]:
         if BULLET_RE.match(sentence) or predicate == "next_action":
             predicate = "next_action"
             confidence = max(confidence, 0.84)
-        object_text = _extract_object_text(sentence, predicate, tokens)
-        object_type, object_json = _object_type_and_json(predicate, object_text)
-        facts.append(
-            Fact(
-                subject=subject,
-                predicate=predicate,
-                object_text=object_text,
-                object_type=object_type,
-                object_json=object_json,
-                evidence_excerpt=clamp_text(sentence, 350),
-                confidence=confidence,
+        produced += 1
+        if predicate_filter is None or predicate == predicate_filter:
+            object_text = _extract_object_text(sentence, predicate, tokens)
+            object_type, object_json = _object_type_and_json(predicate, object_text)
+            facts.append(
+                Fact(
+                    subject=subject,
+                    predicate=predicate,
+                    object_text=object_text,
+                    object_type=object_type,
+                    object_json=object_json,
+                    evidence_excerpt=clamp_text(sentence, 350),
+                    confidence=confidence,
+                )
             )
-        )
-        if len(facts) >= max_facts:
+        if produced >= max_facts:
             break
 
     return dedupe_facts(facts, max_facts=max_facts)
@@ -1484,9 +1514,9 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if args.backend == "sqlite" and not args.db:
         parser.error("--db is required when --backend sqlite")
     if args.note_id and args.source not in {"all", "notes"}:
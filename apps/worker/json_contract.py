@@ -7,6 +7,11 @@ import json
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on local env
+    orjson = None
+
 
 def repo_root() -> Path:
     return Path(__file__).resolve().parents[2]
@@ -42,67 +47,127 @@ def _matches_type(expected_type: str, value: Any) -> bool:
     return False
 
 
-def _validate(schema: dict[str, Any], value: Any, path: str, errors: list[str]) -> None:
-    schema_type = schema.get("type")
+MAX_REPORTED_ERRORS = 10
+
+
+class _StopValidation(Exception):
+    pass
+
+
+JsonPath = tuple[str | int, ...]
+
+
+def _fmt_path(path: JsonPath) -> str:
+    parts = ["$"]
+    for segment in path:
+        if isinstance(segment, int):
+            parts.append(f"[{segment}]")
+        else:
+            parts.append(f".{segment}")
+    return "".join(parts)
+
+
+def _report(errors: list[str], path: JsonPath, message: str) -> None:
+    # the path is only rendered when an error is actually emitted
+    errors.append(f"{_fmt_path(path)}: {message}")
+    if len(errors) >= MAX_REPORTED_ERRORS:
+        raise _StopValidation
+
+
+# (type, enum, minimum, maximum, required, properties, additionalProperties, items);
+# an empty schema accepts anything and compiles to None.
+CompiledSchema = tuple[Any, ...]
+
+
+def _compile_schema(schema: dict[str, Any]) -> CompiledSchema | None:
+    if not schema:
+        return None
+    properties = schema.get("properties", {})
+    items = schema.get("items")
+    return (
+        schema.get("type"),
+        schema.get("enum"),
+        schema.get("minimum"),
+        schema.get("maximum"),
+        tuple(schema.get("required", ())),
+        {
+            key: _compile_schema(prop) if isinstance(prop, dict) else None
+            for key, prop in properties.items()
+        },
+        schema.get("additionalProperties", True),
+        _compile_schema(items) if isinstance(items, dict) else None,
+    )
+
+
+def _validate(compiled: CompiledSchema, value: Any, path: JsonPath, errors: list[str]) -> None:
+    (
+        schema_type,
+        enum_values,
+        minimum,
+        maximum,
+        required,
+        properties,
+        additional_allowed,
+        item_schema,
+    ) = compiled
+
     if schema_type is not None:
         if isinstance(schema_type, list):
             if not any(_matches_type(str(t), value) for t in schema_type):
-                errors.append(f"{path}: expected one of {schema_type}, got {type(value).__name__}")
+                _report(errors, path, f"expected one of {schema_type}, got {type(value).__name__}")
                 return
         else:
             if not _matches_type(str(schema_type), value):
-                errors.append(f"{path}: expected {schema_type}, got {type(value).__name__}")
+                _report(errors, path, f"expected {schema_type}, got {type(value).__name__}")
                 return
 
-    enum_values = schema.get("enum")
     if enum_values is not None and value not in enum_values:
-        errors.append(f"{path}: value {value!r} not in enum {enum_values}")
+        _report(errors, path, f"value {value!r} not in enum {enum_values}")
 
-    if _is_number(value):
-        minimum = schema.get("minimum")
+    if (minimum is not None or maximum is not None) and _is_number(value):
         if minimum is not None and float(value) < float(minimum):
-            errors.append(f"{path}: value {value} < minimum {minimum}")
-        maximum = schema.get("maximum")
+            _report(errors, path, f"value {value} < minimum {minimum}")
         if maximum is not None and float(value) > float(maximum):
-            errors.append(f"{path}: value {value} > maximum {maximum}")
+            _report(errors, path, f"value {value} > maximum {maximum}")
 
     if isinstance(value, dict):
-        required = schema.get("required", [])
         for key in required:
             if key not in value:
-                errors.append(f"{path}: missing required property {key!r}")
-
-        properties = schema.get("properties", {})
-        additional_allowed = schema.get("additionalProperties", True)
+                _report(errors, path, f"missing required property {key!r}")
 
         for key, item in value.items():
-            child_path = f"{path}.{key}"
             if key in properties:
                 prop_schema = properties[key]
-                if isinstance(prop_schema, dict):
-                    _validate(prop_schema, item, child_path, errors)
+                if prop_schema is not None:
+                    _validate(prop_schema, item, path + (key,), errors)
             elif additional_allowed is False:
-                errors.append(f"{path}: additional property {key!r} is not allowed")
+                _report(errors, path, f"additional property {key!r} is not allowed")
 
-    if isinstance(value, list):
-        item_schema = schema.get("items")
-        if isinstance(item_schema, dict):
-            for idx, item in enumerate(value):
-                _validate(item_schema, item, f"{path}[{idx}]", errors)
+    if item_schema is not None and isinstance(value, list):
+        for idx, item in enumerate(value):
+            _validate(item_schema, item, path + (idx,), errors)
 
 
 def validate_contract(schema_path: Path, payload: dict[str, Any]) -> None:
     if not schema_path.exists():
         raise FileNotFoundError(f"worker result schema not found: {schema_path}")
 
-    with schema_path.open("r", encoding="utf-8") as f:
-        schema = json.load(f)
+    if orjson is not None:
+        schema = orjson.loads(schema_path.read_bytes())
+    else:
+        with schema_path.open("r", encoding="utf-8") as f:
+            schema = json.load(f)
 
     if not isinstance(schema, dict):
         raise ValueError(f"invalid schema format: {schema_path}")
 
     errors: list[str] = []
-    _validate(schema, payload, "$", errors)
+    compiled = _compile_schema(schema)
+    if compiled is not None:
+        try:
+            _validate(compiled, payload, (), errors)
+        except _StopValidation:
+            pass
     if errors:
-        joined = "; ".join(errors[:10])
+        joined = "; ".join(errors)
         raise ValueError(f"result payload does not match contract {schema_path.name}: {joined}")
@@ -12,22 +12,33 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
 import uuid
-from typing import Any, Literal, Mapping
+from dataclasses import dataclass
+from typing import Any, Iterator, Literal, Mapping
 
 from db_runtime import (
     DEFAULT_NEON_CONNECT_TIMEOUT_S,
     DEFAULT_NEON_DSN_ENV,
+    copy_to_temp_table,
+    exec_many,
     exec_write,
-    fetch_all,
     fetch_one,
+    is_sqlite_conn,
+    iter_all,
     now_expr,
     open_connection,
+    savepoint,
     to_text_datetime,
 )
 from japanese_nlp import tokenize_with_lemma
 from json_contract import validate_contract, worker_schema_path
-from rule_lexicon import ACTION_HINT_LEMMAS, CLASSIFICATION_LEMMAS, TIME_HINT_LEMMAS
+from rule_lexicon import ACTION_HINT_GROUP, TIME_HINT_GROUP, scan_classification_lemmas
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on local env
+    orjson = None
 
 
 SOURCE_KIND = "ingestion-rules-v1"
@@ -58,16 +69,94 @@ LEADING_TASK_PREFIX_RE = re.compile(
     r"^\s*(?:\[[ xX]\]|\(\s\)|todo[:：]?\s*|task[:：]?\s*|やること[:：]?\s*)",
     re.IGNORECASE,
 )
+# runs between the separators str.splitlines() breaks on (\r, U+2028, ... as well as \n)
+LINE_RE = re.compile(r"[^\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]+")
 
 RowLike = Mapping[str, Any]
+# (capture_id, status, parsed_note_id, parsed_task_id)
+StatusUpdate = tuple[str, str, str | None, str | None]
 TASK_SCORE_THRESHOLD = 2.2
 AMBIGUOUS_MARGIN = 0.35
 
+# Per-capture statements keep a constant SQL text so they can be prepared once
+# (psycopg) or served from the statement cache (sqlite3). `{now}` is filled by now_expr.
+ACTIVE_ID_SQL = {
+    table: f"""
+        SELECT id
+        FROM {table}
+        WHERE source_capture_id = %s AND deleted_at IS NULL
+        LIMIT 1
+        """
+    for table in ("notes", "tasks")
+}
+INSERT_TASK_SQL = """
+        INSERT INTO tasks (
+          id, source_capture_id, title, details, status, priority, source, sensitivity, created_at, updated_at
+        ) VALUES (%s, %s, %s, %s, 'todo', %s, 'extracted', %s, {now}, {now})
+        """
+INSERT_NOTE_SQL = """
+        INSERT INTO notes (
+          id, source_capture_id, note_type, title, summary, body, occurred_at, journal_date,
+          mood_score, energy_score, source_url, source_id, sensitivity, review_status,
+          created_at, updated_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'active', {now}, {now})
+        """
+MARK_PROCESSED_SQL = """
+        UPDATE captures_raw
+        SET status = 'processed',
+            parsed_note_id = %s,
+            parsed_task_id = %s,
+            updated_at = {now}
+        WHERE id = %s
+        """
+MARK_BLOCKED_SQL = """
+        UPDATE captures_raw
+        SET status = 'blocked', updated_at = {now}
+        WHERE id = %s
+        """
+STATUS_UPDATES_TABLE = "capture_status_updates"
+STATUS_UPDATES_COLUMNS = ("capture_id", "status", "parsed_note_id", "parsed_task_id")
+APPLY_STATUS_UPDATES_SQL = """
+        UPDATE captures_raw AS c
+        SET status = u.status,
+            parsed_note_id = CASE WHEN u.status = 'processed' THEN u.parsed_note_id ELSE c.parsed_note_id END,
+            parsed_task_id = CASE WHEN u.status = 'processed' THEN u.parsed_task_id ELSE c.parsed_task_id END,
+            updated_at = {now}
+        FROM {table} AS u
+        WHERE c.id = u.capture_id
+        """
+
+
+@dataclass(frozen=True)
+class CaptureStatements:
+    insert_task: str
+    insert_note: str
+    mark_processed: str
+    mark_blocked: str
+    apply_status_updates: str
+
+
+def build_capture_statements(conn: Any) -> CaptureStatements:
+    now = now_expr(conn)
+    # active unique index on source_capture_id turns the dedupe check into the insert itself.
+    # ON CONFLICT only skips uniqueness conflicts (sqlite >= 3.35 accepts the same syntax);
+    # NOT NULL/CHECK violations still raise.
+    suffix = " ON CONFLICT DO NOTHING RETURNING id"
+    return CaptureStatements(
+        insert_task=INSERT_TASK_SQL.format(now=now) + suffix,
+        insert_note=INSERT_NOTE_SQL.format(now=now) + suffix,
+        mark_processed=MARK_PROCESSED_SQL.format(now=now),
+        mark_blocked=MARK_BLOCKED_SQL.format(now=now),
+        apply_status_updates=APPLY_STATUS_UPDATES_SQL.format(now=now, table=STATUS_UPDATES_TABLE),
+    )
+
+
+# uuid7 is available in recent Python; fallback keeps portability.
+_ID_FN = getattr(uuid, "uuid7", uuid.uuid4)
+
 
 def _new_id() -> str:
-    if hasattr(uuid, "uuid7"):
-        return str(uuid.uuid7())  # type: ignore[attr-defined]
-    return str(uuid.uuid4())
+    return str(_ID_FN())
 
 
 def clamp(value: str, max_len: int) -> str:
@@ -78,30 +167,27 @@ def clamp(value: str, max_len: int) -> str:
 
 
 def first_non_empty_line(text: str) -> str:
-    for line in text.splitlines():
-        line = line.strip()
+    # scan lazily so long captures are not split into a full list of lines
+    for match in LINE_RE.finditer(text):
+        line = match.group().strip()
         if line:
             return line
     return ""
 
 
-def _norm_lemma(value: str) -> str:
-    return value.strip().lower()
-
-
 def _lemma_scores(text: str) -> dict[str, float]:
     tokens = tokenize_with_lemma(text)
-    lemma_set = {_norm_lemma(t.lemma) for t in tokens if _norm_lemma(t.lemma)}
+    hits = scan_classification_lemmas(t.lemma for t in tokens)
     scores = {"task": 0.0, "journal": 0.0, "learning": 0.0, "thought": 0.0}
 
-    for category, hints in CLASSIFICATION_LEMMAS.items():
-        hits = lemma_set.intersection({_norm_lemma(h) for h in hints})
-        if hits:
-            scores[category] += min(len(hits), 5) * 0.55
+    for category in scores:
+        matched = hits.get(category)
+        if matched:
+            scores[category] += min(len(matched), 5) * 0.55
 
-    if lemma_set.intersection({_norm_lemma(v) for v in TIME_HINT_LEMMAS}):
+    if TIME_HINT_GROUP in hits:
         scores["journal"] += 0.8
-    if lemma_set.intersection({_norm_lemma(v) for v in ACTION_HINT_LEMMAS}):
+    if ACTION_HINT_GROUP in hits:
         scores["task"] += 0.8
     return scores
 
@@ -181,8 +267,7 @@ def extract_priority(text: str) -> int:
     return 3
 
 
-def extract_score(pattern: re.Pattern[str], text: str) -> int | None:
-    m = pattern.search(text)
+def _score_from_match(m: re.Match[str] | None) -> int | None:
     if not m:
         return None
     value = int(m.group(1))
@@ -191,6 +276,14 @@ def extract_score(pattern: re.Pattern[str], text: str) -> int | None:
     return None
 
 
+def extract_mood(text: str) -> int | None:
+    return _score_from_match(MOOD_RE.search(text))
+
+
+def extract_energy(text: str) -> int | None:
+    return _score_from_match(ENERGY_RE.search(text))
+
+
 def note_title(text: str, fallback: str) -> str:
     line = first_non_empty_line(text)
     if not line:
@@ -208,19 +301,20 @@ def task_title(text: str) -> str:
     return clamp(line, MAX_TITLE_LEN)
 
 
-def fetch_captures(conn: Any, capture_id: str | None, limit: int) -> list[RowLike]:
+def fetch_captures(conn: Any, capture_id: str | None, limit: int) -> Iterator[RowLike]:
     if capture_id:
-        return fetch_all(
+        return iter_all(
             conn,
             """
             SELECT *
             FROM captures_raw
-            WHERE id = %s
+            WHERE id = %s AND status NOT IN ('blocked', 'processed', 'archived')
             """,
             (capture_id,),
+            cursor_name="captures_iter",
         )
 
-    return fetch_all(
+    return iter_all(
         conn,
         """
         SELECT *
@@ -230,51 +324,60 @@ def fetch_captures(conn: Any, capture_id: str | None, limit: int) -> list[RowLik
         LIMIT %s
         """,
         (limit,),
+        cursor_name="captures_iter",
     )
 
 
+def _active_id_for_capture(conn: Any, table: str, capture_id: str) -> str | None:
+    existing = fetch_one(conn, ACTIVE_ID_SQL[table], (capture_id,), prepare=True)
+    if existing:
+        return str(existing["id"])
+    return None
+
+
+def _insert_or_existing_id(
+    conn: Any,
+    table: str,
+    insert_sql: str,
+    params: tuple[Any, ...],
+    capture_id: str,
+) -> str:
+    inserted = fetch_one(conn, insert_sql, params, prepare=True)
+    if inserted:
+        return str(inserted["id"])
+
+    existing = _active_id_for_capture(conn, table, capture_id)
+    if existing is None:
+        raise RuntimeError(f"insert into {table} was ignored for capture {capture_id}")
+    return existing
+
+
 def write_task(
     conn: Any,
     capture: RowLike,
     *,
     dry_run: bool,
+    statements: CaptureStatements | None = None,
 ) -> str:
-    existing = fetch_one(
-        conn,
-        """
-        SELECT id
-        FROM tasks
-        WHERE source_capture_id = %s AND deleted_at IS NULL
-        LIMIT 1
-        """,
-        (capture["id"],),
-    )
-    if existing:
-        return str(existing["id"])
-
-    task_id = _new_id()
     raw_text = capture["raw_text"] or ""
     if dry_run:
-        return task_id
+        return _active_id_for_capture(conn, "tasks", capture["id"]) or _new_id()
 
-    now = now_expr(conn)
-    exec_write(
+    statements = statements or build_capture_statements(conn)
+    return _insert_or_existing_id(
         conn,
-        f"""
-        INSERT INTO tasks (
-          id, source_capture_id, title, details, status, priority, source, sensitivity, created_at, updated_at
-        ) VALUES (%s, %s, %s, %s, 'todo', %s, 'extracted', %s, {now}, {now})
-        """,
+        "tasks",
+        statements.insert_task,
         (
-            task_id,
+            _new_id(),
             capture["id"],
             task_title(raw_text),
             raw_text,
             extract_priority(raw_text),
             capture["sensitivity"],
         ),
+        capture["id"],
     )
-    return task_id
 
 
 def write_note(
@@ -283,21 +386,8 @@ def write_note(
     *,
     note_type: Literal["journal", "learning", "thought"] | None = None,
     dry_run: bool,
+    statements: CaptureStatements | None = None,
 ) -> str:
-    existing = fetch_one(
-        conn,
-        """
-        SELECT id
-        FROM notes
-        WHERE source_capture_id = %s AND deleted_at IS NULL
-        LIMIT 1
-        """,
-        (capture["id"],),
-    )
-    if existing:
-        return str(existing["id"])
-
-    note_id = _new_id()
     raw_text = capture["raw_text"] or ""
     input_type = capture["input_type"] or "note"
     occurred_at = to_text_datetime(capture["occurred_at"] or capture["created_at"])
@@ -306,25 +396,20 @@ def write_note(
     summary = clamp(raw_text, 160)
     if source_url:
         summary = clamp(re.sub(URL_RE, "", raw_text).strip() or raw_text, 160)
-    mood_score = extract_score(MOOD_RE, raw_text) if ntype == "journal" else None
-    energy_score = extract_score(ENERGY_RE, raw_text) if ntype == "journal" else None
+    mood_score = extract_mood(raw_text) if ntype == "journal" else None
+    energy_score = extract_energy(raw_text) if ntype == "journal" else None
     journal_date = occurred_at[:10] if (ntype == "journal" and occurred_at) else None
 
     if dry_run:
-        return note_id
+        return _active_id_for_capture(conn, "notes", capture["id"]) or _new_id()
 
-    now = now_expr(conn)
-    exec_write(
+    statements = statements or build_capture_statements(conn)
+    return _insert_or_existing_id(
         conn,
-        f"""
-        INSERT INTO notes (
-          id, source_capture_id, note_type, title, summary, body, occurred_at, journal_date,
-          mood_score, energy_score, source_url, source_id, sensitivity, review_status,
-          created_at, updated_at
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'active', {now}, {now})
-        """,
+        "notes",
+        statements.insert_note,
         (
-            note_id,
+            _new_id(),
             capture["id"],
             ntype,
             note_title(raw_text, fallback=f"{ntype} note"),
@@ -338,8 +423,8 @@ def write_note(
             capture["source_id"],
             capture["sensitivity"],
         ),
+        capture["id"],
     )
-    return note_id
 
 
 def mark_capture_processed(
@@ -349,21 +434,20 @@ def mark_capture_processed(
     parsed_note_id: str | None = None,
     parsed_task_id: str | None = None,
     dry_run: bool,
+    statements: CaptureStatements | None = None,
+    status_updates: list[StatusUpdate] | None = None,
 ) -> None:
     if dry_run:
         return
-    now = now_expr(conn)
+    if status_updates is not None:
+        status_updates.append((capture_id, "processed", parsed_note_id, parsed_task_id))
+        return
+    statements = statements or build_capture_statements(conn)
     exec_write(
         conn,
-        f"""
-        UPDATE captures_raw
-        SET status = 'processed',
-            parsed_note_id = %s,
-            parsed_task_id = %s,
-            updated_at = {now}
-        WHERE id = %s
-        """,
+        statements.mark_processed,
         (parsed_note_id, parsed_task_id, capture_id),
+        prepare=True,
     )
 
 
@@ -372,38 +456,79 @@ def mark_capture_blocked(
     capture_id: str,
     *,
     dry_run: bool,
+    statements: CaptureStatements | None = None,
+    status_updates: list[StatusUpdate] | None = None,
 ) -> None:
     if dry_run:
         return
-    now = now_expr(conn)
-    exec_write(
-        conn,
-        f"""
-        UPDATE captures_raw
-        SET status = 'blocked', updated_at = {now}
-        WHERE id = %s
-        """,
-        (capture_id,),
-    )
+    if status_updates is not None:
+        status_updates.append((capture_id, "blocked", None, None))
+        return
+    statements = statements or build_capture_statements(conn)
+    exec_write(conn, statements.mark_blocked, (capture_id,), prepare=True)
+
+
+def apply_capture_status_updates(
+    conn: Any,
+    status_updates: list[StatusUpdate],
+    statements: CaptureStatements,
+) -> None:
+    if not status_updates:
+        return
+    if is_sqlite_conn(conn):
+        exec_many(
+            conn,
+            statements.mark_processed,
+            [(n, t, cid) for cid, status, n, t in status_updates if status == "processed"],
+        )
+        exec_many(
+            conn,
+            statements.mark_blocked,
+            [(cid,) for cid, status, _, _ in status_updates if status == "blocked"],
+        )
+        return
+    copy_to_temp_table(conn, STATUS_UPDATES_TABLE, STATUS_UPDATES_COLUMNS, status_updates)
+    exec_write(conn, statements.apply_status_updates)
 
 
-def process_one(conn: Any, capture: RowLike, dry_run: bool) -> tuple[str, str]:
+def process_one(
+    conn: Any,
+    capture: RowLike,
+    dry_run: bool,
+    statements: CaptureStatements | None = None,
+    status_updates: list[StatusUpdate] | None = None,
+) -> tuple[str, str]:
     capture_id = capture["id"]
     status = capture["status"]
     pii_score = float(capture["pii_score"] or 0)
     input_type = capture["input_type"] or "note"
     raw_text = capture["raw_text"] or ""
-    classification = classify_capture(input_type, raw_text)
 
+    # fetch_captures already filters these out; kept as a guard for direct callers
     if status in {"blocked", "processed", "archived"}:
         return ("skipped", capture_id)
     if pii_score >= 0.9:
-        mark_capture_blocked(conn, capture_id, dry_run=dry_run)
+        mark_capture_blocked(
+            conn,
+            capture_id,
+            dry_run=dry_run,
+            statements=statements,
+            status_updates=status_updates,
+        )
         return ("blocked", capture_id)
 
+    classification = classify_capture(input_type, raw_text)
+
     if classification["is_task"]:
-        task_id = write_task(conn, capture, dry_run=dry_run)
-        mark_capture_processed(conn, capture_id, parsed_task_id=task_id, dry_run=dry_run)
+        task_id = write_task(conn, capture, dry_run=dry_run, statements=statements)
+        mark_capture_processed(
+            conn,
+            capture_id,
+            parsed_task_id=task_id,
+            dry_run=dry_run,
+            statements=statements,
+            status_updates=status_updates,
+        )
         return ("task", task_id)
 
     note_id = write_note(
@@ -411,8 +536,16 @@ def process_one(conn: Any, capture: RowLike, dry_run: bool) -> tuple[str, str]:
         capture,
         note_type=classification["note_type"],
         dry_run=dry_run,
+        statements=statements,
+    )
+    mark_capture_processed(
+        conn,
+        capture_id,
+        parsed_note_id=note_id,
+        dry_run=dry_run,
+        statements=statements,
+        status_updates=status_updates,
     )
-    mark_capture_processed(conn, capture_id, parsed_note_id=note_id, dry_run=dry_run)
     return ("note", note_id)
 
 
@@ -432,10 +565,21 @@ def run(args: argparse.Namespace) -> int:
     errors = 0
 
     try:
+        statements = build_capture_statements(conn)
+        # status changes are applied in one batch after the loop
+        status_updates: list[StatusUpdate] = []
         captures = fetch_captures(conn, capture_id=args.capture_id, limit=args.limit)
         for capture in captures:
             try:
-                kind, _ = process_one(conn, capture, dry_run=args.dry_run)
+                # a failed capture must not abort the transaction the batch apply runs in
+                with savepoint(conn, "capture_row"):
+                    kind, _ = process_one(
+                        conn,
+                        capture,
+                        dry_run=args.dry_run,
+                        statements=statements,
+                        status_updates=status_updates,
+                    )
             except Exception:
                 errors += 1
                 continue
@@ -449,6 +593,7 @@ def run(args: argparse.Namespace) -> int:
                 skipped += 1
 
         if not args.dry_run:
+            apply_capture_status_updates(conn, status_updates, statements)
             conn.commit()
     finally:
         conn.close()
@@ -465,7 +610,10 @@ def run(args: argparse.Namespace) -> int:
         "dry_run": args.dry_run,
     }
     validate_contract(worker_schema_path("process_captures"), result_payload)
-    print(json.dumps(result_payload, ensure_ascii=False))
+    if orjson is not None:
+        sys.stdout.write(orjson.dumps(result_payload).decode("utf-8") + "\n")
+    else:
+        print(json.dumps(result_payload, ensure_ascii=False))
     return 0
 
 
@@ -496,9 +644,9 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if args.backend == "sqlite" and not args.db:
         parser.error("--db is required when --backend sqlite")
     return run(args)
@@ -3,9 +3,18 @@
 
 from __future__ import annotations
 
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Iterable
 
-CLASSIFICATION_LEMMAS: dict[str, set[str]] = {
-    "task": {
+
+def _frozen(*values: str) -> frozenset[str]:
+    return frozenset(sys.intern(v) if v.isascii() else v for v in values)
+
+
+CLASSIFICATION_LEMMAS: dict[str, frozenset[str]] = {
+    "task": _frozen(
         "todo",
         "task",
         "next",
@@ -24,8 +33,8 @@ CLASSIFICATION_LEMMAS: dict[str, set[str]] = {
         "期限",
         "締切",
         "完了",
-    },
-    "journal": {
+    ),
+    "journal": _frozen(
         "今日",
         "昨日",
         "朝",
@@ -39,8 +48,8 @@ CLASSIFICATION_LEMMAS: dict[str, set[str]] = {
         "energy",
         "diary",
         "journal",
-    },
-    "learning": {
+    ),
+    "learning": _frozen(
         "学ぶ",
         "学び",
         "学ん",
@@ -56,8 +65,8 @@ CLASSIFICATION_LEMMAS: dict[str, set[str]] = {
         "insight",
         "knowledge",
         "調べる",
-    },
-    "thought": {
+    ),
+    "thought": _frozen(
         "考え",
         "思考",
         "悩み",
@@ -70,21 +79,21 @@ CLASSIFICATION_LEMMAS: dict[str, set[str]] = {
         "疑問",
         "メモ",
         "方針",
-    },
+    ),
 }
 
 
-TIME_HINT_LEMMAS: set[str] = {
+TIME_HINT_LEMMAS: frozenset[str] = _frozen(
     "今日",
     "昨日",
     "明日",
     "朝",
     "夜",
     "今朝",
-}
+)
 
 
-ACTION_HINT_LEMMAS: set[str] = {
+ACTION_HINT_LEMMAS: frozenset[str] = _frozen(
     "する",
     "やる",
     "対応",
@@ -95,17 +104,17 @@ ACTION_HINT_LEMMAS: set[str] = {
     "送る",
     "fix",
     "review",
-}
+)
 
 
-PREDICATE_LEMMA_HINTS: dict[str, set[str]] = {
-    "learned": {"学ぶ", "学び", "学ん", "学習", "理解", "気づく", "learn", "insight"},
-    "decided": {"決める", "決定", "選ぶ", "choose", "decide"},
-    "blocked_by": {"課題", "問題", "詰まる", "障害", "困る", "blocked", "不足"},
-    "improved": {"改善", "効率化", "最適化", "最適", "良くなる", "improve", "optimize"},
-    "next_action": {"次", "todo", "やる", "対応", "next", "will", "明日", "次回", "予定"},
-    "tested": {"試す", "試験", "実験", "検証", "テスト", "実施", "experiment", "test"},
-    "felt": {
+PREDICATE_LEMMA_HINTS: dict[str, frozenset[str]] = {
+    "learned": _frozen("学ぶ", "学び", "学ん", "学習", "理解", "気づく", "learn", "insight"),
+    "decided": _frozen("決める", "決定", "選ぶ", "choose", "decide"),
+    "blocked_by": _frozen("課題", "問題", "詰まる", "障害", "困る", "blocked", "不足"),
+    "improved": _frozen("改善", "効率化", "最適化", "最適", "良くなる", "improve", "optimize"),
+    "next_action": _frozen("次", "todo", "やる", "対応", "next", "will", "明日", "次回", "予定"),
+    "tested": _frozen("試す", "試験", "実験", "検証", "テスト", "実施", "experiment", "test"),
+    "felt": _frozen(
         "感じる",
         "疲れる",
         "つらい",
@@ -117,11 +126,11 @@ PREDICATE_LEMMA_HINTS: dict[str, set[str]] = {
         "落ち込む",
         "モヤモヤ",
         "feel",
-    },
+    ),
 }
 
 
-OBJECT_STOP_LEMMAS: set[str] = {
+OBJECT_STOP_LEMMAS: frozenset[str] = _frozen(
     "する",
     "なる",
     "ある",
@@ -135,4 +144,76 @@ OBJECT_STOP_LEMMAS: set[str] = {
     "ます",
     "todo",
     "next",
+)
+
+
+TIME_HINT_GROUP = "time_hint"
+ACTION_HINT_GROUP = "action_hint"
+
+
+@lru_cache(maxsize=8192)
+def normalize_for_match(value: str) -> str:
+    # ASCII is already NFKC-stable; only non-ASCII lemmas (fullwidth/halfwidth forms) pay for NFKC.
+    # Halfwidth katakana voiced marks need composition, so a plain str.translate table cannot replace it.
+    if value.isascii():
+        return value.strip().lower()
+    return unicodedata.normalize("NFKC", value).strip().lower()
+
+
+def _build_classification_index() -> dict[str, tuple[str, ...]]:
+    groups: dict[str, list[str]] = {}
+    sources = [
+        *CLASSIFICATION_LEMMAS.items(),
+        (TIME_HINT_GROUP, TIME_HINT_LEMMAS),
+        (ACTION_HINT_GROUP, ACTION_HINT_LEMMAS),
+    ]
+    for group, lemmas in sources:
+        for lemma in lemmas:
+            key = normalize_for_match(lemma)
+            if key.isascii():
+                key = sys.intern(key)
+            if key and group not in groups.setdefault(key, []):
+                groups[key].append(group)
+    return {key: tuple(value) for key, value in groups.items()}
+
+
+# normalized lemma -> classification groups it belongs to, built once at import
+LEMMA_TO_CATEGORIES: dict[str, tuple[str, ...]] = _build_classification_index()
+
+
+# predicate -> normalized hint lemmas, so matchers never re-normalize the lexicon per call
+NORMALIZED_PREDICATE_HINTS: dict[str, frozenset[str]] = {
+    predicate: frozenset(key for key in (normalize_for_match(v) for v in hints) if key)
+    for predicate, hints in PREDICATE_LEMMA_HINTS.items()
 }
+
+
+def _build_predicate_index() -> dict[str, str]:
+    index: dict[str, str] = {}
+    for predicate, hints in NORMALIZED_PREDICATE_HINTS.items():
+        for lemma in hints:
+            index.setdefault(lemma, predicate)
+    return index
+
+
+# normalized lemma -> predicate; on collisions the predicate declared first in
+# PREDICATE_LEMMA_HINTS wins, matching the old dict-order scan.
+LEMMA_TO_PREDICATE: dict[str, str] = _build_predicate_index()
+
+# predicate -> declaration order, used to pick the highest-priority hit across tokens
+PREDICATE_PRIORITY: dict[str, int] = {predicate: rank for rank, predicate in enumerate(PREDICATE_LEMMA_HINTS)}
+
+
+def lemma_predicate(lemma: str) -> str | None:
+    return LEMMA_TO_PREDICATE.get(normalize_for_match(lemma))
+
+
+# Matches token lemmas against every classification lexicon in one pass and returns
+# the normalized lemmas that fired, keyed by category (plus TIME/ACTION hint groups).
+def scan_classification_lemmas(lemmas: Iterable[str]) -> dict[str, set[str]]:
+    hits: dict[str, set[str]] = {}
+    for lemma in lemmas:
+        key = normalize_for_match(lemma)
+        for group in LEMMA_TO_CATEGORIES.get(key, ()):
+            hits.setdefault(group, set()).add(key)
+    return hits
@@ -4,10 +4,20 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import mmap
+import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, TypeVar
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on local env
+    orjson = None
 
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -19,49 +29,70 @@ import extract_key_facts  # noqa: E402
 import process_captures  # noqa: E402
 
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 CLASS_LABELS = ["task", "journal", "learning", "thought"]
+# below this many rows a process pool costs more to start than it saves
+PARALLEL_MIN_ROWS = 64
 
 
 def load_jsonl(path: Path) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rows.append(json.loads(line))
-    return rows
-
-
-def classification_metrics(rows: list[dict[str, Any]]) -> dict[str, Any]:
-    stats = {label: {"tp": 0, "fp": 0, "fn": 0} for label in CLASS_LABELS}
-    correct = 0
-    for row in rows:
-        text = str(row["text"])
-        input_type = str(row.get("input_type", "note"))
-        expected = str(row["expected_label"])
-
-        pred_result = process_captures.classify_capture(input_type, text)
-        predicted = "task" if pred_result["is_task"] else pred_result["note_type"]
+    loads = orjson.loads if orjson is not None else json.loads
+    with path.open("rb") as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [loads(line) for line in mm[:].splitlines() if line.strip()]
+
+
+def _extract_facts(
+    item_type: str,
+    text: str,
+    row_id: str,
+    predicate_filter: str | None = None,
+) -> list[extract_key_facts.Fact]:
+    if item_type == "task":
+        sample_row = _build_task_row(text, row_id)
+        return extract_key_facts.extract_from_task_rules(sample_row, max_facts=12, predicate_filter=predicate_filter)
+    sample_row = _build_note_row(text, row_id)
+    return extract_key_facts.extract_from_note_rules(sample_row, max_facts=12, predicate_filter=predicate_filter)
+
+
+def _map_rows(fn: Callable[[T], R], items: list[T], jobs: int) -> list[R]:
+    if jobs <= 1 or len(items) < PARALLEL_MIN_ROWS:
+        return [fn(item) for item in items]
+    chunksize = max(1, len(items) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, items, chunksize=chunksize))
+
+
+def _classify_row(row: dict[str, Any]) -> tuple[str, str]:
+    text = str(row["text"])
+    input_type = str(row.get("input_type", "note"))
+    pred_result = process_captures.classify_capture(input_type, text)
+    predicted = "task" if pred_result["is_task"] else pred_result["note_type"]
+    return str(row["expected_label"]), predicted
+
+
+def classification_metrics(rows: list[dict[str, Any]], *, jobs: int = 1) -> dict[str, Any]:
+    tp: Counter[str] = Counter()
+    fp: Counter[str] = Counter()
+    fn: Counter[str] = Counter()
+    for expected, predicted in _map_rows(_classify_row, rows, jobs):
         if predicted == expected:
-            correct += 1
-
-        for label in CLASS_LABELS:
-            if predicted == label and expected == label:
-                stats[label]["tp"] += 1
-            elif predicted == label and expected != label:
-                stats[label]["fp"] += 1
-            elif predicted != label and expected == label:
-                stats[label]["fn"] += 1
+            tp[predicted] += 1
+        else:
+            fp[predicted] += 1
+            fn[expected] += 1
 
     per_class: dict[str, dict[str, float]] = {}
     f1_sum = 0.0
     for label in CLASS_LABELS:
-        tp = stats[label]["tp"]
-        fp = stats[label]["fp"]
-        fn = stats[label]["fn"]
-        precision = tp / (tp + fp) if (tp + fp) else 0.0
-        recall = tp / (tp + fn) if (tp + fn) else 0.0
+        label_tp, label_fp, label_fn = tp[label], fp[label], fn[label]
+        precision = label_tp / (label_tp + label_fp) if (label_tp + label_fp) else 0.0
+        recall = label_tp / (label_tp + label_fn) if (label_tp + label_fn) else 0.0
         f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0.0
         f1_sum += f1
         per_class[label] = {
@@ -71,7 +102,7 @@ def classification_metrics(rows: list[dict[str, Any]]) -> dict[str, Any]:
         }
 
     macro_f1 = f1_sum / len(CLASS_LABELS)
-    accuracy = correct / len(rows) if rows else 0.0
+    accuracy = sum(tp.values()) / len(rows) if rows else 0.0
     return {
         "samples": len(rows),
         "accuracy": round(accuracy, 4),
@@ -80,90 +111,142 @@ def classification_metrics(rows: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
+# fixed columns of the synthetic rows handed to the rule extractors; copied per row
+_NOTE_TEMPLATE: dict[str, Any] = {
+    "id": "",
+    "note_type": "thought",
+    "title": "",
+    "summary": "",
+    "body": "",
+    "occurred_at": "2026-02-21T00:00:00Z",
+    "journal_date": None,
+    "mood_score": None,
+    "energy_score": None,
+    "source_url": None,
+}
+
+_TASK_TEMPLATE: dict[str, Any] = {
+    "id": "",
+    "title": "",
+    "details": "",
+    "status": "todo",
+    "priority": 2,
+    "due_at": None,
+    "scheduled_at": None,
+    "done_at": None,
+    "source_note_id": None,
+}
+
+
 def _build_note_row(text: str, note_id: str) -> dict[str, Any]:
-    return {
-        "id": note_id,
-        "note_type": "thought",
-        "title": "",
-        "summary": "",
-        "body": text,
-        "occurred_at": "2026-02-21T00:00:00Z",
-        "journal_date": None,
-        "mood_score": None,
-        "energy_score": None,
-        "source_url": None,
-    }
+    row = _NOTE_TEMPLATE.copy()
+    row["id"] = note_id
+    row["body"] = text
+    return row
 
 
 def _build_task_row(text: str, task_id: str) -> dict[str, Any]:
-    return {
-        "id": task_id,
-        "title": text,
-        "details": text,
-        "status": "todo",
-        "priority": 2,
-        "due_at": None,
-        "scheduled_at": None,
-        "done_at": None,
-        "source_note_id": None,
-    }
+    row = _TASK_TEMPLATE.copy()
+    row["id"] = task_id
+    row["title"] = text
+    row["details"] = text
+    return row
+
+
+# (subject, predicate, normalized object); plain str tuples pickle back from --jobs workers
+DedupeKey = tuple[str, str, str]
+
+
+def _dedupe_key(fact: extract_key_facts.Fact) -> DedupeKey:
+    return (
+        fact.subject.strip().lower(),
+        fact.predicate.strip().lower(),
+        extract_key_facts._normalize_for_dedupe(fact.object_text),
+    )
 
 
-def facts_metrics(rows: list[dict[str, Any]]) -> dict[str, Any]:
+def _facts_row(
+    item: tuple[int, dict[str, Any]],
+    predicates_only: bool = False,
+) -> tuple[bool, bool, int, list[DedupeKey]]:
+    idx, row = item
+    text = str(row["text"])
+    item_type = str(row.get("item_type", "note"))
+    expected = row["expected"]
+    expected_predicate = str(expected["predicate"])
+    expected_object_contains = str(expected.get("object_contains", "")).strip()
+
+    row_id = f"task-eval-{idx}" if item_type == "task" else f"note-eval-{idx}"
+    if predicates_only:
+        pred_matches = _extract_facts(item_type, text, row_id, expected_predicate)
+        object_hit = _object_hit(pred_matches, expected_object_contains)
+        return bool(pred_matches), object_hit, 0, []
+
+    facts = _extract_facts(item_type, text, row_id)
+    pred_matches = [f for f in facts if f.predicate == expected_predicate]
+    object_hit = _object_hit(pred_matches, expected_object_contains)
+    return bool(pred_matches), object_hit, len(facts), [_dedupe_key(f) for f in facts]
+
+
+def _object_hit(pred_matches: list[extract_key_facts.Fact], expected_object_contains: str) -> bool:
+    if expected_object_contains:
+        lowered = expected_object_contains.lower()
+        return any(lowered in f.object_text.lower() for f in pred_matches)
+    return bool(pred_matches)
+
+
+def facts_metrics(
+    rows: list[dict[str, Any]],
+    *,
+    debug_dedupe: bool = False,
+    predicates_only: bool = False,
+    jobs: int = 1,
+) -> dict[str, Any]:
     predicate_hits = 0
     object_hits = 0
     total_fact_count = 0
-    normalized_keys: set[tuple[str, str, str]] = set()
-
-    for idx, row in enumerate(rows, start=1):
-        text = str(row["text"])
-        item_type = str(row.get("item_type", "note"))
-        expected = row["expected"]
-        expected_predicate = str(expected["predicate"])
-        expected_object_contains = str(expected.get("object_contains", "")).strip()
-
-        if item_type == "task":
-            sample_row = _build_task_row(text, f"task-eval-{idx}")
-            facts = extract_key_facts.extract_from_task_rules(sample_row, max_facts=12)
-        else:
-            sample_row = _build_note_row(text, f"note-eval-{idx}")
-            facts = extract_key_facts.extract_from_note_rules(sample_row, max_facts=12)
-
-        total_fact_count += len(facts)
-        for fact in facts:
-            normalized_keys.add(
-                (
-                    fact.subject.strip().lower(),
-                    fact.predicate.strip().lower(),
-                    extract_key_facts._normalize_for_dedupe(fact.object_text),
-                )
-            )
-
-        pred_matches = [f for f in facts if f.predicate == expected_predicate]
-        if pred_matches:
+    normalized_keys: set[DedupeKey] = set()
+    duplicate_keys: list[DedupeKey] = []
+
+    items = list(enumerate(rows, start=1))
+    row_fn = functools.partial(_facts_row, predicates_only=predicates_only)
+    for predicate_hit, object_hit, fact_count, keys in _map_rows(row_fn, items, jobs):
+        total_fact_count += fact_count
+        if debug_dedupe:
+            duplicate_keys.extend(key for key in keys if key in normalized_keys)
+        normalized_keys.update(keys)
+        if predicate_hit:
             predicate_hits += 1
-
-        if expected_object_contains:
-            lowered = expected_object_contains.lower()
-            if any(lowered in f.object_text.lower() for f in pred_matches):
-                object_hits += 1
-        elif pred_matches:
+        if object_hit:
             object_hits += 1
 
     samples = len(rows)
     predicate_precision = predicate_hits / samples if samples else 0.0
     object_match_rate = object_hits / samples if samples else 0.0
-    duplicate_rate = 0.0
-    if total_fact_count > 0:
-        duplicate_rate = (total_fact_count - len(normalized_keys)) / total_fact_count
-
-    return {
+    report: dict[str, Any] = {
         "samples": samples,
         "predicate_precision": round(predicate_precision, 4),
         "object_match_rate": round(object_match_rate, 4),
-        "duplicate_rate": round(duplicate_rate, 4),
-        "facts_total": total_fact_count,
+        "duplicate_rate": None,
+        "facts_total": None,
     }
+    # filtered extraction never sees the other predicates, so dedupe stats need the full pass
+    if not predicates_only:
+        duplicate_rate = 0.0
+        if total_fact_count > 0:
+            duplicate_rate = (total_fact_count - len(normalized_keys)) / total_fact_count
+        report["duplicate_rate"] = round(duplicate_rate, 4)
+        report["facts_total"] = total_fact_count
+        if debug_dedupe:
+            report["duplicate_keys"] = [" | ".join(key) for key in duplicate_keys]
+    return report
+
+
+def _non_negative_int(value: str) -> int:
+    jobs = int(value)
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {jobs}")
+    return jobs
 
 
 def main() -> int:
@@ -184,13 +267,35 @@ def main() -> int:
     parser.add_argument("--expected-captures-samples", type=int, default=100)
     parser.add_argument("--expected-facts-samples", type=int, default=100)
     parser.add_argument("--enforce", action="store_true", help="Exit non-zero when thresholds fail")
+    parser.add_argument(
+        "--debug-dedupe",
+        action="store_true",
+        help="List the readable dedupe keys counted as duplicates in the facts report",
+    )
+    parser.add_argument(
+        "--predicates-only",
+        action="store_true",
+        help="Only extract facts for each row's expected predicate (skips duplicate_rate/facts_total)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=_non_negative_int,
+        default=1,
+        help="Worker processes for rule evaluation (0 = os.cpu_count())",
+    )
     args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
 
     captures = load_jsonl(ROOT / args.captures_labels)
     facts = load_jsonl(ROOT / args.facts_labels)
 
-    captures_metrics = classification_metrics(captures)
-    facts_metrics_payload = facts_metrics(facts)
+    captures_metrics = classification_metrics(captures, jobs=jobs)
+    facts_metrics_payload = facts_metrics(
+        facts,
+        debug_dedupe=args.debug_dedupe,
+        predicates_only=args.predicates_only,
+        jobs=jobs,
+    )
     report = {
         "captures": captures_metrics,
         "facts": facts_metrics_payload,
@@ -202,7 +307,10 @@ def main() -> int:
             "expected_facts_samples": args.expected_facts_samples,
         },
     }
-    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if orjson is not None:
+        sys.stdout.write(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode("utf-8") + "\n")
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
 
     if args.enforce:
         if captures_metrics["samples"] != args.expected_captures_samples:
@@ -213,7 +321,8 @@ def main() -> int:
             return 1
         if facts_metrics_payload["predicate_precision"] < args.min_predicate_precision:
             return 1
-        if facts_metrics_payload["duplicate_rate"] > args.max_duplicate_rate:
+        duplicate_rate = facts_metrics_payload["duplicate_rate"]
+        if duplicate_rate is not None and duplicate_rate > args.max_duplicate_rate:
             return 1
     return 0
 
@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+
+# pytest loads this before collecting any test module; the per-file sys.path preambles stay so
+# `python3 -m unittest discover -s tests` keeps working without pytest.
+ROOT = Path(__file__).resolve().parents[1]
+for _path in (ROOT / "apps/worker", ROOT / "apps/cli"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
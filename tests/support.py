@@ -0,0 +1,80 @@
+"""Shared helpers for tests that drive the CLI/worker scripts against SQLite.
+
+Most tests call a script's ``main(argv)`` in-process against a named shared-cache memory
+DB (``file:<name>?mode=memory&cache=shared``): the script opens its own connection to the
+same database by URI, and the database lives as long as the test's connection stays open.
+
+Each script still keeps one real process run, on a DB file, so its entry point and the
+file-path handling stay covered; a separate process cannot see an in-memory DB.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import io
+import json
+import sqlite3
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SCHEMA_SQL = ROOT / "schemas/sql/001_core.sql"
+
+
+@functools.lru_cache(maxsize=None)
+def schema_template() -> sqlite3.Connection:
+    # schema applied once per process; tests copy the pages into their own DB with backup()
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+    return conn
+
+
+def open_memory_db(name: str, template: sqlite3.Connection | None = None) -> tuple[str, sqlite3.Connection]:
+    uri = f"file:{name}?mode=memory&cache=shared"
+    conn = sqlite3.connect(uri, uri=True)
+    (template or schema_template()).backup(conn)
+    return uri, conn
+
+
+@contextlib.contextmanager
+def temp_db_file(template: sqlite3.Connection | None = None) -> Iterator[tuple[Path, sqlite3.Connection]]:
+    # file copy for the real process run; removed on exit
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tf:
+        db_file = Path(tf.name)
+    conn = sqlite3.connect(db_file)
+    try:
+        # the copy is throwaway, so skip fsync on the write
+        conn.execute("PRAGMA synchronous=OFF")
+        (template or schema_template()).backup(conn)
+        yield db_file, conn
+    finally:
+        conn.close()
+        db_file.unlink(missing_ok=True)
+
+
+def _first_json_line(stdout: str | bytes) -> dict:
+    # scripts print one JSON object per line; the result payload comes first.
+    # json.loads takes the subprocess bytes as-is, so they are never decoded twice.
+    return json.loads(next(line for line in stdout.splitlines() if line.strip()))
+
+
+def call_main(main: Callable[[list[str]], int], argv: list[str]) -> tuple[int, dict]:
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        code = main(argv)
+    return code, _first_json_line(stdout.getvalue())
+
+
+def run_script(script: Path, *args: str, env: dict[str, str] | None = None) -> dict:
+    result = subprocess.run(
+        ["python3", str(script), *args],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        env=env,
+    )
+    return _first_json_line(result.stdout)
@@ -1,39 +1,34 @@
-import json
+import io
 import sqlite3
-import subprocess
-import tempfile
+import sys
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
-SCHEMA_SQL = ROOT / "schemas/sql/001_core.sql"
+ROOT = Path(__file__).resolve().parents[1]
 CAPTURE_CLI = ROOT / "apps/cli/capture.py"
+CLI_DIR = ROOT / "apps/cli"
+if str(CLI_DIR) not in sys.path:
+    sys.path.insert(0, str(CLI_DIR))
+
+import capture  # noqa: E402
+from support import call_main, open_memory_db, run_script, temp_db_file  # noqa: E402
 
 
 class CaptureCliTest(unittest.TestCase):
     def setUp(self) -> None:
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = Path(self.tmpdir.name) / "brain_dock.db"
-        self.conn = sqlite3.connect(self.db_path)
+        self.db_path, self.conn = open_memory_db(f"capture_cli_{self._testMethodName}")
         self.conn.row_factory = sqlite3.Row
-        self.conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
 
     def tearDown(self) -> None:
         self.conn.close()
-        self.tmpdir.cleanup()
 
     def run_cli(self, *args: str, input_text: str | None = None) -> dict:
-        cmd = ["python3", str(CAPTURE_CLI), "--db", str(self.db_path), *args]
-        result = subprocess.run(
-            cmd,
-            cwd=ROOT,
-            check=True,
-            capture_output=True,
-            text=True,
-            input=input_text,
-        )
-        return json.loads(result.stdout.strip())
+        with mock.patch("sys.stdin", io.StringIO(input_text or "")):
+            code, output = call_main(capture.main, ["--db", self.db_path, *args])
+        self.assertEqual(code, 0)
+        return output
 
     def test_inserts_capture_and_reuses_source(self) -> None:
         out1 = self.run_cli(
@@ -84,13 +79,14 @@ class CaptureCliTest(unittest.TestCase):
         self.assertIn("TODO", row["raw_text"])
 
     def test_dry_run_writes_nothing(self) -> None:
-        out = self.run_cli("--dry-run", "dry run capture")
-        self.assertTrue(out["dry_run"])
-
-        source_count = self.conn.execute("SELECT COUNT(*) AS c FROM sources").fetchone()["c"]
-        capture_count = self.conn.execute("SELECT COUNT(*) AS c FROM captures_raw").fetchone()["c"]
-        self.assertEqual(source_count, 0)
-        self.assertEqual(capture_count, 0)
+        with temp_db_file() as (db_file, file_conn):
+            out = run_script(CAPTURE_CLI, "--db", str(db_file), "--dry-run", "dry run capture")
+            self.assertTrue(out["dry_run"])
+
+            source_count = file_conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+            capture_count = file_conn.execute("SELECT COUNT(*) FROM captures_raw").fetchone()[0]
+            self.assertEqual(source_count, 0)
+            self.assertEqual(capture_count, 0)
 
 
 if __name__ == "__main__":
@@ -3,41 +3,21 @@ import unittest
 from pathlib import Path
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
+ROOT = Path(__file__).resolve().parents[1]
 WORKER_DIR = ROOT / "apps/worker"
 if str(WORKER_DIR) not in sys.path:
     sys.path.insert(0, str(WORKER_DIR))
 
-from claim_schema_v2 import claims_response_schema, parse_claims_output  # noqa: E402
-
-
-def _assert_all_properties_are_required(node: dict) -> None:
-    if not isinstance(node, dict):
-        return
-    if node.get("type") == "object":
-        properties = node.get("properties")
-        if isinstance(properties, dict) and properties:
-            required = node.get("required")
-            if isinstance(required, list):
-                missing = [key for key in properties.keys() if key not in required]
-                if missing:
-                    raise AssertionError(f"missing required keys for strict schema: {missing}")
-
-    properties = node.get("properties")
-    if isinstance(properties, dict):
-        for value in properties.values():
-            if isinstance(value, dict):
-                _assert_all_properties_are_required(value)
-
-    items = node.get("items")
-    if isinstance(items, dict):
-        _assert_all_properties_are_required(items)
+import claim_schema  # noqa: E402
+import claim_schema_v2  # noqa: E402
+from claim_schema_v2 import parse_claims_output  # noqa: E402
 
 
 class ClaimSchemaTest(unittest.TestCase):
     def test_strict_response_schema_has_required_for_all_properties(self) -> None:
-        schema = claims_response_schema()
-        _assert_all_properties_are_required(schema)
+        for module in (claim_schema, claim_schema_v2):
+            with self.subTest(schema=module.__name__):
+                self.assertEqual(module.strict_required_errors(), [])
 
     def test_parse_claims_output_does_not_cap_claim_count(self) -> None:
         claims = []
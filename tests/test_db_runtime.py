@@ -0,0 +1,200 @@
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+WORKER_DIR = ROOT / "apps/worker"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
+
+import db_runtime  # noqa: E402
+import process_captures  # noqa: E402
+from support import call_main  # noqa: E402
+
+
+class _FakeCopy:
+    def __init__(self, cursor: "_FakeCursor") -> None:
+        self.cursor = cursor
+
+    def __enter__(self) -> "_FakeCopy":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def write_row(self, row: Any) -> None:
+        self.cursor.conn.copied_rows.append(tuple(row))
+
+
+class _FakeCursor:
+    def __init__(self, conn: "_FakeConnection", name: str | None) -> None:
+        self.conn = conn
+        self.name = name
+        self.itersize: int | None = None
+        self.rowcount = 1
+
+    def __enter__(self) -> "_FakeCursor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def __iter__(self):
+        return iter(self.conn.rows)
+
+    def execute(self, query: str, params: tuple = (), prepare: bool | None = None) -> None:
+        query = " ".join(query.split())
+        # like PostgreSQL, refuse everything but a rollback once a statement has failed
+        if self.conn.failed and not query.startswith("ROLLBACK"):
+            raise RuntimeError("current transaction is aborted")
+        if query.startswith("ROLLBACK TO SAVEPOINT"):
+            self.conn.failed = False
+        self.conn.calls.append(("execute", query, params, prepare))
+
+    def executemany(self, query: str, rows: list[tuple]) -> None:
+        self.conn.calls.append(("executemany", " ".join(query.split()), rows, None))
+
+    def copy(self, statement: str) -> _FakeCopy:
+        if self.conn.failed:
+            raise RuntimeError("current transaction is aborted")
+        self.conn.calls.append(("copy", statement, (), None))
+        return _FakeCopy(self)
+
+    def fetchone(self) -> Any:
+        return self.conn.rows[0] if self.conn.rows else None
+
+
+class _FakeConnection:
+    # stands in for a psycopg connection; records every statement sent through a cursor
+    def __init__(self, rows: list[Any] | None = None) -> None:
+        self.rows = rows or []
+        self.calls: list[tuple] = []
+        self.copied_rows: list[tuple] = []
+        self.cursors: list[_FakeCursor] = []
+        self.failed = False
+        self.committed = False
+
+    def cursor(self, name: str | None = None) -> _FakeCursor:
+        cur = _FakeCursor(self, name)
+        self.cursors.append(cur)
+        return cur
+
+    def commit(self) -> None:
+        if self.failed:
+            raise RuntimeError("current transaction is aborted")
+        self.committed = True
+
+    def close(self) -> None:
+        return None
+
+
+class DbRuntimePostgresPathTest(unittest.TestCase):
+    def test_iter_all_uses_named_cursor_with_itersize(self) -> None:
+        conn = _FakeConnection(rows=[{"id": "a"}, {"id": "b"}])
+        query = "SELECT id FROM notes WHERE x = %s"
+        rows = list(db_runtime.iter_all(conn, query, ("v",), cursor_name="scan", itersize=7))
+        self.assertEqual(rows, [{"id": "a"}, {"id": "b"}])
+        self.assertEqual(len(conn.cursors), 1)
+        self.assertEqual(conn.cursors[0].name, "scan")
+        self.assertEqual(conn.cursors[0].itersize, 7)
+        self.assertEqual(conn.calls, [("execute", query, ("v",), None)])
+
+    def test_prepare_is_forwarded(self) -> None:
+        conn = _FakeConnection(rows=[{"id": "a"}])
+        self.assertEqual(db_runtime.fetch_one(conn, "SELECT 1", prepare=True), {"id": "a"})
+        self.assertEqual(db_runtime.exec_write(conn, "UPDATE t SET x = %s", (1,), prepare=False), 1)
+        self.assertEqual(
+            conn.calls,
+            [
+                ("execute", "SELECT 1", (), True),
+                ("execute", "UPDATE t SET x = %s", (1,), False),
+            ],
+        )
+
+    def test_copy_to_temp_table_rejects_sqlite(self) -> None:
+        with sqlite3.connect(":memory:") as conn, self.assertRaises(ValueError):
+            db_runtime.copy_to_temp_table(conn, "t", ("a",), [("1",)])
+
+    def test_status_updates_copy_into_temp_table_then_update_from(self) -> None:
+        conn = _FakeConnection()
+        statements = process_captures.build_capture_statements(conn)
+        updates = [
+            ("cap-1", "processed", "note-1", None),
+            ("cap-2", "blocked", None, None),
+        ]
+        process_captures.apply_capture_status_updates(conn, updates, statements)
+
+        self.assertEqual(
+            [call[:2] for call in conn.calls],
+            [
+                (
+                    "execute",
+                    "CREATE TEMP TABLE capture_status_updates (capture_id text, status text, "
+                    "parsed_note_id text, parsed_task_id text) ON COMMIT DROP",
+                ),
+                (
+                    "copy",
+                    "COPY capture_status_updates (capture_id, status, parsed_note_id, parsed_task_id) FROM STDIN",
+                ),
+                (
+                    "execute",
+                    "UPDATE captures_raw AS c SET status = u.status, "
+                    "parsed_note_id = CASE WHEN u.status = 'processed' THEN u.parsed_note_id "
+                    "ELSE c.parsed_note_id END, "
+                    "parsed_task_id = CASE WHEN u.status = 'processed' THEN u.parsed_task_id "
+                    "ELSE c.parsed_task_id END, "
+                    "updated_at = now() FROM capture_status_updates AS u WHERE c.id = u.capture_id",
+                ),
+            ],
+        )
+        self.assertEqual(conn.copied_rows, updates)
+
+    def test_status_updates_noop_when_empty(self) -> None:
+        conn = _FakeConnection()
+        statements = process_captures.build_capture_statements(conn)
+        process_captures.apply_capture_status_updates(conn, [], statements)
+        self.assertEqual(conn.calls, [])
+
+
+class ProcessCapturesPostgresRunTest(unittest.TestCase):
+    def test_failed_capture_rolls_back_to_savepoint_and_run_reports_errors(self) -> None:
+        conn = _FakeConnection(rows=[{"id": "cap-bad"}, {"id": "cap-ok"}])
+
+        def fake_process_one(conn, capture, dry_run, statements, status_updates):  # noqa: ARG001
+            if capture["id"] == "cap-bad":
+                # a failed statement aborts the PostgreSQL transaction
+                conn.failed = True
+                raise RuntimeError("insert failed")
+            status_updates.append((capture["id"], "processed", "note-ok", None))
+            return "note", "note-ok"
+
+        with (
+            mock.patch.object(process_captures, "open_connection", return_value=conn),
+            mock.patch.object(process_captures, "process_one", side_effect=fake_process_one),
+        ):
+            code, output = call_main(
+                process_captures.main, ["--backend", "neon", "--neon-dsn", "postgresql://fake"]
+            )
+
+        self.assertEqual(code, 0)
+        self.assertEqual(output["errors"], 1)
+        self.assertEqual(output["notes_created"], 1)
+        self.assertTrue(conn.committed)
+        self.assertEqual(
+            [call[1] for call in conn.calls if "SAVEPOINT" in call[1]],
+            [
+                "SAVEPOINT capture_row",
+                "ROLLBACK TO SAVEPOINT capture_row",
+                "SAVEPOINT capture_row",
+                "RELEASE SAVEPOINT capture_row",
+            ],
+        )
+        self.assertEqual(conn.copied_rows, [("cap-ok", "processed", "note-ok", None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
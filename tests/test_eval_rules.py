@@ -4,23 +4,49 @@ import unittest
 from pathlib import Path
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
+ROOT = Path(__file__).resolve().parents[1]
 EVAL_SCRIPT = ROOT / "scripts/eval/eval_rules.py"
 
 
+def run_eval(*args: str) -> dict:
+    result = subprocess.run(
+        ["python3", str(EVAL_SCRIPT), *args],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    )
+    return json.loads(result.stdout)
+
+
 class EvalRulesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.serial_payload = run_eval("--enforce")
+
     def test_eval_script_outputs_metrics_and_passes_thresholds(self) -> None:
+        payload = self.serial_payload
+        self.assertGreaterEqual(payload["captures"]["macro_f1"], 0.80)
+        self.assertGreaterEqual(payload["facts"]["predicate_precision"], 0.85)
+        self.assertLessEqual(payload["facts"]["duplicate_rate"], 0.05)
+
+    def test_parallel_jobs_match_serial_report(self) -> None:
+        self.assertEqual(run_eval("--enforce", "--jobs", "2"), self.serial_payload)
+
+    def test_rejects_negative_jobs(self) -> None:
         result = subprocess.run(
-            ["python3", str(EVAL_SCRIPT), "--enforce"],
+            ["python3", str(EVAL_SCRIPT), "--jobs", "-1"],
             cwd=ROOT,
-            check=True,
             capture_output=True,
-            text=True,
         )
-        payload = json.loads(result.stdout)
-        self.assertGreaterEqual(payload["captures"]["macro_f1"], 0.80)
+        self.assertEqual(result.returncode, 2)
+        self.assertIn(b"--jobs", result.stderr)
+
+    def test_predicates_only_skips_dedupe_stats(self) -> None:
+        # check=True in run_eval means --enforce exited 0
+        payload = run_eval("--enforce", "--predicates-only")
+        self.assertIsNone(payload["facts"]["duplicate_rate"])
+        self.assertIsNone(payload["facts"]["facts_total"])
         self.assertGreaterEqual(payload["facts"]["predicate_precision"], 0.85)
-        self.assertLessEqual(payload["facts"]["duplicate_rate"], 0.05)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,10 @@
 import sys
 import unittest
+from dataclasses import replace
 from pathlib import Path
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
+ROOT = Path(__file__).resolve().parents[1]
 WORKER_DIR = ROOT / "apps/worker"
 if str(WORKER_DIR) not in sys.path:
     sys.path.insert(0, str(WORKER_DIR))
@@ -28,22 +29,31 @@ def _claim(subject: str, predicate: str, obj: str, certainty: float = 0.9) -> Pa
     )
 
 
+def _normalize(
+    claims: list[ParsedClaim],
+    raw_text: str,
+    *,
+    declared_type: str = "journal",
+    links: list[ParsedClaimLink] | None = None,
+) -> ParsedClaimsOutput:
+    parsed = ParsedClaimsOutput(claims=claims, entities=[], links=links or [])
+    return normalize_to_me_centric_claims(
+        parsed,
+        raw_text=raw_text,
+        declared_type=declared_type,
+        occurred_at_utc="2026-02-22T00:00:00Z",
+    )
+
+
 class MeCentricClaimNormalizationTest(unittest.TestCase):
     def test_keeps_me_claims_and_adds_decision_cause_link(self) -> None:
-        parsed = ParsedClaimsOutput(
-            claims=[
+        out = _normalize(
+            [
                 _claim("私", "did", "同期とお台場で遊んだ"),
                 _claim("weather", "happened", "雨が降った"),
                 _claim("me", "ended", "即解散した"),
             ],
-            entities=[],
-            links=[],
-        )
-        out = normalize_to_me_centric_claims(
-            parsed,
-            raw_text="今日お台場で同期と遊んだら雨降ってきて即解散になった",
-            declared_type="journal",
-            occurred_at_utc="2026-02-22T00:00:00Z",
+            "今日お台場で同期と遊んだら雨降ってきて即解散になった",
         )
         summaries = {(c.subject_text, c.predicate, c.object_text) for c in out.claims}
         self.assertIn(("me", "did", "同期とお台場で遊んだ"), summaries)
@@ -56,36 +66,21 @@ class MeCentricClaimNormalizationTest(unittest.TestCase):
         self.assertTrue(caused_by_links, "decision->cause link should exist")
 
     def test_keeps_non_me_claims_without_forced_fallback(self) -> None:
-        parsed = ParsedClaimsOutput(
-            claims=[_claim("weather", "happened", "強い雨が降った")],
-            entities=[],
-            links=[],
-        )
-        out = normalize_to_me_centric_claims(
-            parsed,
-            raw_text="強い雨が降った",
-            declared_type="journal",
-            occurred_at_utc="2026-02-22T00:00:00Z",
-        )
+        out = _normalize([_claim("weather", "happened", "強い雨が降った")], "強い雨が降った")
         self.assertEqual(len(out.claims), 1)
         self.assertEqual(out.claims[0].subject_text, "weather")
         self.assertEqual(out.claims[0].predicate, "happened")
 
     def test_rewrites_links_after_filter(self) -> None:
-        parsed = ParsedClaimsOutput(
-            claims=[
+        out = _normalize(
+            [
                 _claim("me", "did", "資料を送付した"),
                 _claim("team", "happened", "会議が延期された"),
                 _claim("me", "decided", "別日程で再調整した"),
             ],
-            entities=[],
-            links=[ParsedClaimLink(from_claim_index=2, to_claim_index=1, relation_type="caused_by", confidence=0.8)],
-        )
-        out = normalize_to_me_centric_claims(
-            parsed,
-            raw_text="会議延期のため別日程で再調整した",
+            "会議延期のため別日程で再調整した",
             declared_type="meeting",
-            occurred_at_utc="2026-02-22T00:00:00Z",
+            links=[ParsedClaimLink(from_claim_index=2, to_claim_index=1, relation_type="caused_by", confidence=0.8)],
         )
         self.assertTrue(out.links)
         for link in out.links:
@@ -95,19 +90,12 @@ class MeCentricClaimNormalizationTest(unittest.TestCase):
             self.assertLess(link.to_claim_index, len(out.claims))
 
     def test_context_completion_for_fragmented_state_change(self) -> None:
-        parsed = ParsedClaimsOutput(
-            claims=[
+        out = _normalize(
+            [
                 _claim("me", "experienced", "喉の調子が悪くなり"),
                 _claim("me", "experienced", "土曜日はさらに悪化した"),
             ],
-            entities=[],
-            links=[],
-        )
-        out = normalize_to_me_centric_claims(
-            parsed,
-            raw_text="金曜から喉の調子が悪くなり、案の定土曜日はさらに悪化した",
-            declared_type="journal",
-            occurred_at_utc="2026-02-22T00:00:00Z",
+            "金曜から喉の調子が悪くなり、案の定土曜日はさらに悪化した",
         )
         self.assertEqual(len(out.claims), 2)
         self.assertIn("喉の調子", out.claims[1].object_text)
@@ -116,32 +104,25 @@ class MeCentricClaimNormalizationTest(unittest.TestCase):
     def test_restores_source_language_and_then_completes_fragment(self) -> None:
         c1 = _claim("me", "experienced", "sore throat starting Friday")
         c2 = _claim("me", "experienced", "worsened on Saturday")
-        c1 = ParsedClaim(
-            **{
-                **c1.__dict__,
-                "evidence_spans": [ParsedEvidenceSpan(char_start=None, char_end=None, excerpt="金曜から喉の調子が悪くなり")],
-            }
+        c1 = replace(
+            c1,
+            evidence_spans=[ParsedEvidenceSpan(char_start=None, char_end=None, excerpt="金曜から喉の調子が悪くなり")],
         )
-        c2 = ParsedClaim(
-            **{
-                **c2.__dict__,
-                "evidence_spans": [ParsedEvidenceSpan(char_start=None, char_end=None, excerpt="案の定土曜日はさらに悪化した")],
-            }
+        c2 = replace(
+            c2,
+            evidence_spans=[ParsedEvidenceSpan(char_start=None, char_end=None, excerpt="案の定土曜日はさらに悪化した")],
         )
-        parsed = ParsedClaimsOutput(claims=[c1, c2], entities=[], links=[])
-        out = normalize_to_me_centric_claims(
-            parsed,
-            raw_text="バイブコーディング楽しくてずっと作業しちゃってたからか、金曜から喉の調子が悪くなり、案の定土曜日はさらに悪化した。",
-            declared_type="journal",
-            occurred_at_utc="2026-02-22T00:00:00Z",
+        out = _normalize(
+            [c1, c2],
+            "バイブコーディング楽しくてずっと作業しちゃってたからか、金曜から喉の調子が悪くなり、案の定土曜日はさらに悪化した。",
         )
         self.assertIn("喉の調子", out.claims[0].object_text)
         self.assertIn("喉の調子", out.claims[1].object_text)
         self.assertIn("悪化", out.claims[1].object_text)
 
     def test_keeps_all_actions_without_me_related_filtering(self) -> None:
-        parsed = ParsedClaimsOutput(
-            claims=[
+        out = _normalize(
+            [
                 _claim("me", "did", "夜から朝まで作業した"),
                 _claim("me", "did", "ジムに1時間行った"),
                 _claim("me", "did", "背中と足トレをした"),
@@ -149,18 +130,11 @@ class MeCentricClaimNormalizationTest(unittest.TestCase):
                 _claim("me", "planned", "洗濯物を干したら寝る"),
                 _claim("me", "planned", "寝る前にcodex実行指示を出す"),
             ],
-            entities=[],
-            links=[],
-        )
-        out = normalize_to_me_centric_claims(
-            parsed,
-            raw_text=(
+            (
                 "昨日の夜から今日の朝まで作業していた。その後ジムに1時間だけ行って、"
                 "背中と足トレをして帰宅した。洗濯物を干したらこれからたっぷり寝よう。"
                 "その前に寝ている間にもcodexが回るように指示を出す。"
             ),
-            declared_type="journal",
-            occurred_at_utc="2026-02-22T00:00:00Z",
         )
         self.assertEqual(len(out.claims), 6)
         objects = [c.object_text for c in out.claims]
@@ -182,26 +156,17 @@ class MeCentricClaimNormalizationTest(unittest.TestCase):
         self.assertEqual(flags, [])
 
     def test_augments_missing_action_clauses_when_llm_omits_them(self) -> None:
-        parsed = ParsedClaimsOutput(
-            claims=[
-                _claim("me", "did", "昨日の夜から今日の朝まで作業していた"),
-                _claim("me", "planned", "洗濯物を干したらこれからたっぷり寝よう"),
-                _claim("me", "planned", "その前に寝ている間にもcodexが回るように指示を出しておく"),
-            ],
-            entities=[],
-            links=[],
-        )
+        claims = [
+            _claim("me", "did", "昨日の夜から今日の朝まで作業していた"),
+            _claim("me", "planned", "洗濯物を干したらこれからたっぷり寝よう"),
+            _claim("me", "planned", "その前に寝ている間にもcodexが回るように指示を出しておく"),
+        ]
         raw_text = (
             "昨日の夜から今日の朝まで作業していた。その後ジムに1時間だけ行って、背中と足トレをして帰宅した。"
             "洗濯物を干したらこれからたっぷり寝よう。"
             "おっと、その前に寝ている間にもcodexが回るように指示を出しておくのを忘れないようにしなければ。"
         )
-        out = normalize_to_me_centric_claims(
-            parsed,
-            raw_text=raw_text,
-            declared_type="journal",
-            occurred_at_utc="2026-02-22T00:00:00Z",
-        )
+        out = _normalize(claims, raw_text)
         objects = [claim.object_text for claim in out.claims]
         self.assertTrue(any("ジムに1時間だけ行って" in text for text in objects))
         self.assertTrue(any("背中と足トレをして帰宅した" in text for text in objects))
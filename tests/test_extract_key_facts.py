@@ -1,28 +1,25 @@
-import json
-import sqlite3
-import subprocess
-import tempfile
+import sys
 import unittest
 from pathlib import Path
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
-SCHEMA_SQL = ROOT / "schemas/sql/001_core.sql"
+ROOT = Path(__file__).resolve().parents[1]
 WORKER = ROOT / "apps/worker/extract_key_facts.py"
+WORKER_DIR = ROOT / "apps/worker"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
+
+import extract_key_facts  # noqa: E402
+from support import call_main, open_memory_db, run_script, temp_db_file  # noqa: E402
 
 
 class ExtractKeyFactsTest(unittest.TestCase):
     def setUp(self) -> None:
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = Path(self.tmpdir.name) / "brain_dock.db"
-        self.conn = sqlite3.connect(self.db_path)
-        schema = SCHEMA_SQL.read_text(encoding="utf-8")
-        self.conn.executescript(schema)
+        self.db_path, self.conn = open_memory_db(self._testMethodName)
         self.seed_data()
 
     def tearDown(self) -> None:
         self.conn.close()
-        self.tmpdir.cleanup()
 
     def seed_data(self) -> None:
         self.conn.execute(
@@ -64,24 +61,13 @@ class ExtractKeyFactsTest(unittest.TestCase):
         )
         self.conn.commit()
 
+    def worker_args(self, db_path: str, *extra_args: str) -> list[str]:
+        return ["--db", db_path, "--all-rows", "--replace-existing", *extra_args]
+
     def run_worker(self, *extra_args: str) -> dict:
-        cmd = [
-            "python3",
-            str(WORKER),
-            "--db",
-            str(self.db_path),
-            "--all-rows",
-            "--replace-existing",
-            *extra_args,
-        ]
-        result = subprocess.run(
-            cmd,
-            cwd=ROOT,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        return json.loads(result.stdout.strip())
+        code, output = call_main(extract_key_facts.main, self.worker_args(self.db_path, *extra_args))
+        self.assertEqual(code, 0)
+        return output
 
     def test_extracts_facts_for_notes_and_tasks(self) -> None:
         output = self.run_worker("--source", "all")
@@ -117,11 +103,12 @@ class ExtractKeyFactsTest(unittest.TestCase):
         self.assertGreaterEqual(out2["facts_replaced"], 1)
 
     def test_dry_run_does_not_write(self) -> None:
-        output = self.run_worker("--source", "notes", "--dry-run")
-        self.assertGreaterEqual(output["facts_inserted"], 0)
+        with temp_db_file(self.conn) as (db_file, file_conn):
+            output = run_script(WORKER, *self.worker_args(str(db_file), "--source", "notes", "--dry-run"))
+            self.assertGreaterEqual(output["facts_inserted"], 0)
 
-        count = self.conn.execute("SELECT COUNT(*) FROM key_facts").fetchone()[0]
-        self.assertEqual(count, 0)
+            count = file_conn.execute("SELECT COUNT(*) FROM key_facts").fetchone()[0]
+            self.assertEqual(count, 0)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,59 @@
+import io
 import json
 import os
 import sqlite3
-import subprocess
+import sys
 import tempfile
 import threading
 import unittest
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from unittest import mock
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
-SCHEMA_SQL = ROOT / "schemas/sql/001_core.sql"
+ROOT = Path(__file__).resolve().parents[1]
 WORKER = ROOT / "apps/worker/extract_key_facts.py"
+WORKER_DIR = ROOT / "apps/worker"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
+
+import extract_key_facts  # noqa: E402
+from support import call_main, run_script, schema_template  # noqa: E402
+
+
+FAKE_COMPLETION = {
+    "choices": [
+        {
+            "message": {
+                "content": json.dumps(
+                    {
+                        "facts": [
+                            {
+                                "subject": "me",
+                                "predicate": "learned",
+                                "object_text": "retry with exponential backoff",
+                                "object_type": "text",
+                                "confidence": 0.93,
+                                "evidence_excerpt": "retry with exponential backoff を学んだ",
+                            },
+                            {
+                                "subject": "me",
+                                "predicate": "next_action",
+                                "object_text": "次回も使う",
+                                "object_type": "text",
+                                "confidence": 0.8,
+                            },
+                        ]
+                    },
+                    ensure_ascii=False,
+                )
+            }
+        }
+    ]
+}
+
+# the canned response never changes, so encode it once
+FAKE_COMPLETION_BYTES = json.dumps(FAKE_COMPLETION, ensure_ascii=False).encode("utf-8")
 
 
 class _FakeLLMHandler(BaseHTTPRequestHandler):
@@ -24,63 +66,49 @@ class _FakeLLMHandler(BaseHTTPRequestHandler):
         content_len = int(self.headers.get("Content-Length", "0"))
         _ = self.rfile.read(content_len)
 
-        body = {
-            "choices": [
-                {
-                    "message": {
-                        "content": json.dumps(
-                            {
-                                "facts": [
-                                    {
-                                        "subject": "me",
-                                        "predicate": "learned",
-                                        "object_text": "retry with exponential backoff",
-                                        "object_type": "text",
-                                        "confidence": 0.93,
-                                        "evidence_excerpt": "retry with exponential backoff を学んだ",
-                                    },
-                                    {
-                                        "subject": "me",
-                                        "predicate": "next_action",
-                                        "object_text": "次回も使う",
-                                        "object_type": "text",
-                                        "confidence": 0.8,
-                                    },
-                                ]
-                            },
-                            ensure_ascii=False,
-                        )
-                    }
-                }
-            ]
-        }
-        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Content-Length", str(len(FAKE_COMPLETION_BYTES)))
         self.end_headers()
-        self.wfile.write(payload)
+        self.wfile.write(FAKE_COMPLETION_BYTES)
 
     def log_message(self, format: str, *args) -> None:  # noqa: A003
         return
 
 
+class _FakeLLMResponse(io.BytesIO):
+    headers: dict[str, str] = {}
+
+
+def _fake_urlopen(req, timeout=None):  # noqa: ARG001
+    if not req.full_url.endswith("/chat/completions"):
+        raise AssertionError(f"unexpected LLM url: {req.full_url}")
+    return _FakeLLMResponse(FAKE_COMPLETION_BYTES)
+
+
 class ExtractKeyFactsLLMTest(unittest.TestCase):
+    # the fake LLM endpoint is stateless, so one server serves every test in the class
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeLLMHandler)
+        cls.server.daemon_threads = True
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.server_thread.join(timeout=2)
+
     def setUp(self) -> None:
         self.tmpdir = tempfile.TemporaryDirectory()
         self.db_path = Path(self.tmpdir.name) / "brain_dock.db"
         self.conn = sqlite3.connect(self.db_path)
-        self.conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+        schema_template().backup(self.conn)
         self.seed_data()
 
-        self.server = HTTPServer(("127.0.0.1", 0), _FakeLLMHandler)
-        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-        self.server_thread.start()
-
     def tearDown(self) -> None:
-        self.server.shutdown()
-        self.server.server_close()
-        self.server_thread.join(timeout=2)
         self.conn.close()
         self.tmpdir.cleanup()
 
@@ -107,14 +135,8 @@ class ExtractKeyFactsLLMTest(unittest.TestCase):
         )
         self.conn.commit()
 
-    def test_llm_extractor_writes_facts(self) -> None:
-        base_url = f"http://127.0.0.1:{self.server.server_port}"
-        env = os.environ.copy()
-        env["OPENAI_API_KEY"] = "dummy-key"
-
-        cmd = [
-            "python3",
-            str(WORKER),
+    def llm_args(self, base_url: str) -> list[str]:
+        return [
             "--db",
             str(self.db_path),
             "--source",
@@ -126,16 +148,8 @@ class ExtractKeyFactsLLMTest(unittest.TestCase):
             "--llm-base-url",
             base_url,
         ]
-        result = subprocess.run(
-            cmd,
-            cwd=ROOT,
-            check=True,
-            capture_output=True,
-            text=True,
-            env=env,
-        )
-        output = json.loads(result.stdout.strip())
 
+    def assert_llm_facts_written(self, output: dict) -> None:
         self.assertEqual(output["extractor"], "llm")
         self.assertEqual(output["contract_version"], "1.0")
         self.assertEqual(output["errors"], 0)
@@ -150,6 +164,23 @@ class ExtractKeyFactsLLMTest(unittest.TestCase):
         self.assertIn("learned", predicates)
         self.assertIn("next_action", predicates)
 
+    def test_llm_extractor_writes_facts_with_stubbed_http(self) -> None:
+        with (
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "dummy-key"}),
+            mock.patch.object(extract_key_facts.urlrequest, "urlopen", side_effect=_fake_urlopen) as urlopen,
+        ):
+            code, output = call_main(extract_key_facts.main, self.llm_args("http://llm.invalid"))
+        self.assertEqual(code, 0)
+        self.assertEqual(urlopen.call_count, 1)
+        self.assert_llm_facts_written(output)
+
+    def test_llm_extractor_writes_facts(self) -> None:
+        # end to end through a real process and HTTP socket
+        base_url = f"http://127.0.0.1:{self.server.server_port}"
+        env = os.environ.copy()
+        env["OPENAI_API_KEY"] = "dummy-key"
+        self.assert_llm_facts_written(run_script(WORKER, *self.llm_args(base_url), env=env))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,9 +2,10 @@ import os
 import sys
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
+ROOT = Path(__file__).resolve().parents[1]
 WORKER_DIR = ROOT / "apps/worker"
 if str(WORKER_DIR) not in sys.path:
     sys.path.insert(0, str(WORKER_DIR))
@@ -35,6 +36,27 @@ class ExtractKeyFactsRulesRegressionTest(unittest.TestCase):
         predicates = {f.predicate for f in facts}
         self.assertIn("next_action", predicates)
 
+    def test_predicate_filter_matches_full_extraction(self) -> None:
+        row = {
+            "id": "note-reg-2",
+            "note_type": "thought",
+            "title": "",
+            "summary": "検証の要約",
+            "body": "新しいキャッシュ戦略を学んだ。次回は負荷試験を実施する。",
+            "occurred_at": "2026-02-21T00:00:00Z",
+            "journal_date": None,
+            "mood_score": 3,
+            "energy_score": None,
+            "source_url": None,
+        }
+        full = extract_key_facts.extract_from_note_rules(row, max_facts=12)
+        for predicate in {f.predicate for f in full} | {"felt"}:
+            with self.subTest(predicate=predicate):
+                filtered = extract_key_facts.extract_from_note_rules(
+                    row, max_facts=12, predicate_filter=predicate
+                )
+                self.assertEqual(filtered, [f for f in full if f.predicate == predicate])
+
     def test_object_type_normalization(self) -> None:
         obj_type1, obj_json1 = extract_key_facts._object_type_and_json("due_at", "2026-03-01")
         self.assertEqual(obj_type1, "date")
@@ -65,15 +87,8 @@ class ExtractKeyFactsRulesRegressionTest(unittest.TestCase):
             "energy_score": None,
             "source_url": None,
         }
-        old = os.environ.get("BRAIN_DOCK_DISABLE_SUDACHI")
-        os.environ["BRAIN_DOCK_DISABLE_SUDACHI"] = "1"
-        try:
+        with mock.patch.dict(os.environ, {"BRAIN_DOCK_DISABLE_SUDACHI": "1"}):
             facts = extract_key_facts.extract_from_note_rules(row, max_facts=12)
-        finally:
-            if old is None:
-                os.environ.pop("BRAIN_DOCK_DISABLE_SUDACHI", None)
-            else:
-                os.environ["BRAIN_DOCK_DISABLE_SUDACHI"] = old
         predicates = {f.predicate for f in facts}
         self.assertIn("next_action", predicates)
 
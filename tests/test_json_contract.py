@@ -0,0 +1,87 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+WORKER_DIR = ROOT / "apps/worker"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
+
+from json_contract import MAX_REPORTED_ERRORS, validate_contract  # noqa: E402
+
+
+SCHEMA = {
+    "type": "object",
+    "required": ["status", "a"],
+    "additionalProperties": False,
+    "properties": {
+        "status": {"type": "string", "enum": ["ok", "failed"]},
+        "a": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["x"],
+                "properties": {"x": {"type": "number", "minimum": 0, "maximum": 1}},
+            },
+        },
+    },
+}
+
+
+class JsonContractTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.schema_path = Path(tmpdir.name) / "sample.result.schema.json"
+        self.schema_path.write_text(json.dumps(SCHEMA), encoding="utf-8")
+
+    def errors_for(self, payload: dict) -> list[str]:
+        with self.assertRaises(ValueError) as ctx:
+            validate_contract(self.schema_path, payload)
+        _, _, joined = str(ctx.exception).partition(": ")
+        return joined.split("; ")
+
+    def test_valid_payload_passes(self) -> None:
+        validate_contract(self.schema_path, {"status": "ok", "a": [{"x": 0.5}, {"x": 1}]})
+
+    def test_reports_messages_with_nested_paths(self) -> None:
+        errors = self.errors_for(
+            {
+                "status": "done",
+                "a": [{"x": -1}, {"x": 2}, {}, {"x": "1"}],
+                "extra": True,
+            }
+        )
+        self.assertEqual(
+            errors,
+            [
+                "$.status: value 'done' not in enum ['ok', 'failed']",
+                "$.a[0].x: value -1 < minimum 0",
+                "$.a[1].x: value 2 > maximum 1",
+                "$.a[2]: missing required property 'x'",
+                "$.a[3].x: expected number, got str",
+                "$: additional property 'extra' is not allowed",
+            ],
+        )
+
+    def test_reports_missing_required_at_root(self) -> None:
+        self.assertEqual(
+            self.errors_for({}),
+            ["$: missing required property 'status'", "$: missing required property 'a'"],
+        )
+
+    def test_stops_after_max_reported_errors(self) -> None:
+        errors = self.errors_for({"status": "ok", "a": [{"x": 5} for _ in range(25)]})
+        self.assertEqual(len(errors), MAX_REPORTED_ERRORS)
+        self.assertEqual(errors[-1], f"$.a[{MAX_REPORTED_ERRORS - 1}].x: value 5 > maximum 1")
+
+    def test_missing_schema_file_raises(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            validate_contract(self.schema_path.with_name("missing.json"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
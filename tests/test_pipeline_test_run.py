@@ -1,26 +1,25 @@
-import json
-import subprocess
+import sys
 import tempfile
 import unittest
 from pathlib import Path
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
+ROOT = Path(__file__).resolve().parents[1]
 PIPELINE_RUNNER = ROOT / "apps/cli/pipeline_test_run.py"
+CLI_DIR = ROOT / "apps/cli"
+if str(CLI_DIR) not in sys.path:
+    sys.path.insert(0, str(CLI_DIR))
+
+import pipeline_test_run  # noqa: E402
+from support import call_main, run_script  # noqa: E402
 
 
 class PipelineTestRunTest(unittest.TestCase):
     def _run(self, *extra: str) -> dict:
-        cmd = ["python3", str(PIPELINE_RUNNER), *extra]
-        result = subprocess.run(
-            cmd,
-            cwd=ROOT,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
-        return json.loads(lines[0])
+        # the runner itself is called in-process; its stage commands still run as subprocesses
+        code, payload = call_main(pipeline_test_run.main, list(extra))
+        self.assertEqual(code, 0)
+        return payload
 
     def test_runs_stage_1_to_3_for_learning_note(self) -> None:
         payload = self._run("https://example.com 記事で学んだこと")
@@ -42,7 +41,7 @@ class PipelineTestRunTest(unittest.TestCase):
     def test_keep_db_option_persists_file(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
             db_path = Path(tmpdir) / "kept_pipeline.db"
-            payload = self._run("--keep-db", str(db_path), "短い思考メモ")
+            payload = run_script(PIPELINE_RUNNER, "--keep-db", str(db_path), "短い思考メモ")
             self.assertEqual(payload["db_mode"], "kept")
             self.assertEqual(payload["db_path"], str(db_path.resolve()))
             self.assertTrue(db_path.exists())
@@ -1,156 +1,168 @@
-import json
 import sqlite3
-import subprocess
-import tempfile
+import sys
 import unittest
 from pathlib import Path
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
-SCHEMA_SQL = ROOT / "schemas/sql/001_core.sql"
+ROOT = Path(__file__).resolve().parents[1]
 WORKER = ROOT / "apps/worker/process_captures.py"
+WORKER_DIR = ROOT / "apps/worker"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
 
+import process_captures  # noqa: E402
+from support import call_main, open_memory_db, run_script, schema_template, temp_db_file  # noqa: E402
 
-class ProcessCapturesTest(unittest.TestCase):
-    def setUp(self) -> None:
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = Path(self.tmpdir.name) / "brain_dock.db"
-        self.conn = sqlite3.connect(self.db_path)
-        schema = SCHEMA_SQL.read_text(encoding="utf-8")
-        self.conn.executescript(schema)
-        self.seed_data()
-
-    def tearDown(self) -> None:
-        self.conn.close()
-        self.tmpdir.cleanup()
-
-    def seed_data(self) -> None:
-        self.conn.execute(
+
+# (id, source_id, input_type, raw_text, sensitivity, pii_score, status)
+SEED_CAPTURES = (
+    ("cap-note", "src-1", "note", "今日の振り返り。mood:4 energy:3 先延ばしを減らせた。", "internal", 0.0, "new"),
+    ("cap-task", "src-1", "quick", "TODO: PRレビューをする p1", "internal", 0.0, "new"),
+    ("cap-url", "src-1", "url", "https://example.com/llm-memory この記事で学んだことをメモ", "internal", 0.0, "new"),
+    ("cap-block", "src-1", "note", "秘密っぽい情報", "internal", 0.95, "new"),
+)
+
+
+def build_seeded_template() -> sqlite3.Connection:
+    # schema + seed rows in memory; tests copy the pages into their own DB with backup()
+    conn = sqlite3.connect(":memory:")
+    schema_template().backup(conn)
+    with conn:
+        conn.execute(
             "INSERT INTO sources (id, kind, detail) VALUES (?, ?, ?)",
             ("src-1", "cli", "test"),
         )
-        self.conn.execute(
-            """
-            INSERT INTO captures_raw (
-              id, source_id, input_type, raw_text, occurred_at, sensitivity, pii_score, status
-            ) VALUES (?, ?, ?, ?, datetime('now'), ?, ?, ?)
-            """,
-            (
-                "cap-note",
-                "src-1",
-                "note",
-                "今日の振り返り。mood:4 energy:3 先延ばしを減らせた。",
-                "internal",
-                0.0,
-                "new",
-            ),
-        )
-        self.conn.execute(
+        conn.executemany(
             """
             INSERT INTO captures_raw (
               id, source_id, input_type, raw_text, occurred_at, sensitivity, pii_score, status
             ) VALUES (?, ?, ?, ?, datetime('now'), ?, ?, ?)
             """,
-            (
-                "cap-task",
-                "src-1",
-                "quick",
-                "TODO: PRレビューをする p1",
-                "internal",
-                0.0,
-                "new",
-            ),
+            SEED_CAPTURES,
         )
-        self.conn.execute(
-            """
-            INSERT INTO captures_raw (
-              id, source_id, input_type, raw_text, occurred_at, sensitivity, pii_score, status
-            ) VALUES (?, ?, ?, ?, datetime('now'), ?, ?, ?)
-            """,
-            (
-                "cap-url",
-                "src-1",
-                "url",
-                "https://example.com/llm-memory この記事で学んだことをメモ",
-                "internal",
-                0.0,
-                "new",
-            ),
-        )
-        self.conn.execute(
-            """
-            INSERT INTO captures_raw (
-              id, source_id, input_type, raw_text, occurred_at, sensitivity, pii_score, status
-            ) VALUES (?, ?, ?, ?, datetime('now'), ?, ?, ?)
-            """,
-            (
-                "cap-block",
-                "src-1",
-                "note",
-                "秘密っぽい情報",
-                "internal",
-                0.95,
-                "new",
-            ),
-        )
-        self.conn.commit()
-
-    def run_worker(self, *extra_args: str) -> dict:
-        cmd = ["python3", str(WORKER), "--db", str(self.db_path), *extra_args]
-        result = subprocess.run(
-            cmd,
-            cwd=ROOT,
-            check=True,
-            capture_output=True,
-            text=True,
+    return conn
+
+
+def run_worker(db_path: str, *extra_args: str) -> tuple[int, dict]:
+    return call_main(process_captures.main, ["--db", db_path, *extra_args])
+
+
+class ProcessCapturesTest(unittest.TestCase):
+    # the worker runs once per class; each test inspects the resulting output and DB state
+    @classmethod
+    def setUpClass(cls) -> None:
+        template = build_seeded_template()
+        try:
+            cls.db_path, cls.conn = open_memory_db("process_captures_test", template)
+        finally:
+            template.close()
+        cls.exit_code, cls.output = run_worker(cls.db_path)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.conn.close()
+
+    def active_counts(self) -> dict[str, int]:
+        return dict(
+            self.conn.execute(
+                """
+                SELECT 'notes', COUNT(*) FROM notes WHERE deleted_at IS NULL
+                UNION ALL
+                SELECT 'tasks', COUNT(*) FROM tasks WHERE deleted_at IS NULL
+                """
+            )
         )
-        return json.loads(result.stdout.strip())
 
-    def test_processes_new_captures(self) -> None:
-        output = self.run_worker()
-        self.assertEqual(output["notes_created"], 2)
-        self.assertEqual(output["tasks_created"], 1)
-        self.assertEqual(output["captures_blocked"], 1)
-        self.assertEqual(output["errors"], 0)
-        self.assertEqual(output["contract_version"], "1.0")
+    def test_reports_processed_captures(self) -> None:
+        self.assertEqual(self.exit_code, 0)
+        self.assertEqual(self.output["notes_created"], 2)
+        self.assertEqual(self.output["tasks_created"], 1)
+        self.assertEqual(self.output["captures_blocked"], 1)
+        self.assertEqual(self.output["errors"], 0)
+        self.assertEqual(self.output["contract_version"], "1.0")
 
-        notes = self.conn.execute("SELECT COUNT(*) FROM notes WHERE deleted_at IS NULL").fetchone()[0]
-        tasks = self.conn.execute("SELECT COUNT(*) FROM tasks WHERE deleted_at IS NULL").fetchone()[0]
-        self.assertEqual(notes, 2)
-        self.assertEqual(tasks, 1)
+    def test_creates_notes_and_tasks(self) -> None:
+        self.assertEqual(self.active_counts(), {"notes": 2, "tasks": 1})
 
-        statuses = {
-            row[0]: row[1]
-            for row in self.conn.execute("SELECT id, status FROM captures_raw").fetchall()
-        }
+    def test_marks_capture_statuses(self) -> None:
+        statuses = dict(self.conn.execute("SELECT id, status FROM captures_raw"))
         self.assertEqual(statuses["cap-note"], "processed")
         self.assertEqual(statuses["cap-task"], "processed")
         self.assertEqual(statuses["cap-url"], "processed")
         self.assertEqual(statuses["cap-block"], "blocked")
 
-        # idempotent rerun should not create extra notes/tasks
-        output2 = self.run_worker()
-        self.assertEqual(output2["notes_created"], 0)
-        self.assertEqual(output2["tasks_created"], 0)
+    def test_rerun_is_idempotent(self) -> None:
+        # a rerun must not create extra notes/tasks, so it leaves the shared state unchanged
+        exit_code, output = run_worker(self.db_path)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(output["notes_created"], 0)
+        self.assertEqual(output["tasks_created"], 0)
+        self.assertEqual(self.active_counts(), {"notes": 2, "tasks": 1})
+
+    def test_capture_id_on_finished_capture_fetches_nothing(self) -> None:
+        # the status filter runs in SQL, so finished captures are not fetched (or counted as skipped)
+        for capture_id, status in (("cap-task", "processed"), ("cap-block", "blocked")):
+            with self.subTest(capture_id=capture_id):
+                exit_code, output = run_worker(self.db_path, "--capture-id", capture_id)
+                self.assertEqual(exit_code, 0)
+                self.assertEqual(output["captures_processed"], 0)
+                self.assertEqual(output["captures_blocked"], 0)
+                self.assertEqual(output["captures_skipped"], 0)
+                self.assertEqual(output["errors"], 0)
+                row = self.conn.execute(
+                    "SELECT status FROM captures_raw WHERE id = ?", (capture_id,)
+                ).fetchone()
+                self.assertEqual(row[0], status)
+        self.assertEqual(self.active_counts(), {"notes": 2, "tasks": 1})
+
+    def test_reset_capture_reuses_active_note(self) -> None:
+        # a capture put back to 'new' hits the active unique index; the worker must pick up
+        # the existing note instead of creating a second one
+        note_id = self.conn.execute(
+            "SELECT parsed_note_id FROM captures_raw WHERE id = 'cap-note'"
+        ).fetchone()[0]
+        with self.conn:
+            self.conn.execute("UPDATE captures_raw SET status = 'new' WHERE id = 'cap-note'")
 
-        notes2 = self.conn.execute("SELECT COUNT(*) FROM notes WHERE deleted_at IS NULL").fetchone()[0]
-        tasks2 = self.conn.execute("SELECT COUNT(*) FROM tasks WHERE deleted_at IS NULL").fetchone()[0]
-        self.assertEqual(notes2, 2)
-        self.assertEqual(tasks2, 1)
+        exit_code, output = run_worker(self.db_path)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(output["errors"], 0)
+        self.assertEqual(self.active_counts(), {"notes": 2, "tasks": 1})
+        row = self.conn.execute(
+            "SELECT status, parsed_note_id FROM captures_raw WHERE id = 'cap-note'"
+        ).fetchone()
+        self.assertEqual(row, ("processed", note_id))
 
-    def test_dry_run_does_not_write(self) -> None:
-        output = self.run_worker("--dry-run")
-        self.assertGreaterEqual(output["captures_processed"], 1)
 
-        notes = self.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
-        tasks = self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
-        self.assertEqual(notes, 0)
-        self.assertEqual(tasks, 0)
+class FirstNonEmptyLineTest(unittest.TestCase):
+    def test_splits_on_every_line_separator(self) -> None:
+        for text in ("\n  title  \nrest", "\r\ntitle\r\nrest", "\rtitle\rrest", "\u2028title\u2028rest"):
+            with self.subTest(text=text):
+                self.assertEqual(process_captures.first_non_empty_line(text), "title")
 
-        new_count = self.conn.execute(
-            "SELECT COUNT(*) FROM captures_raw WHERE status = 'new'"
-        ).fetchone()[0]
-        self.assertEqual(new_count, 4)
+    def test_blank_text_is_empty(self) -> None:
+        self.assertEqual(process_captures.first_non_empty_line(" \n\r\n\t"), "")
+
+
+class ProcessCapturesDryRunTest(unittest.TestCase):
+    def test_dry_run_does_not_write(self) -> None:
+        template = build_seeded_template()
+        try:
+            with temp_db_file(template) as (db_file, file_conn):
+                output = run_script(WORKER, "--db", str(db_file), "--dry-run")
+                self.assertGreaterEqual(output["captures_processed"], 1)
+
+                notes = file_conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+                tasks = file_conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+                self.assertEqual(notes, 0)
+                self.assertEqual(tasks, 0)
+
+                new_count = file_conn.execute(
+                    "SELECT COUNT(*) FROM captures_raw WHERE status = 'new'"
+                ).fetchone()[0]
+                self.assertEqual(new_count, 4)
+        finally:
+            template.close()
 
 
 if __name__ == "__main__":
@@ -2,9 +2,10 @@ import os
 import sys
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
+ROOT = Path(__file__).resolve().parents[1]
 WORKER_DIR = ROOT / "apps/worker"
 if str(WORKER_DIR) not in sys.path:
     sys.path.insert(0, str(WORKER_DIR))
@@ -36,15 +37,8 @@ class ProcessCapturesRulesRegressionTest(unittest.TestCase):
         self.assertEqual(result["note_type"], "thought")
 
     def test_regex_only_fallback_when_sudachi_disabled(self) -> None:
-        old = os.environ.get("BRAIN_DOCK_DISABLE_SUDACHI")
-        os.environ["BRAIN_DOCK_DISABLE_SUDACHI"] = "1"
-        try:
+        with mock.patch.dict(os.environ, {"BRAIN_DOCK_DISABLE_SUDACHI": "1"}):
             result = process_captures.classify_capture("quick", "TODO: リリース準備")
-        finally:
-            if old is None:
-                os.environ.pop("BRAIN_DOCK_DISABLE_SUDACHI", None)
-            else:
-                os.environ["BRAIN_DOCK_DISABLE_SUDACHI"] = old
         self.assertTrue(result["is_task"])
 
 
@@ -0,0 +1,45 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+WORKER_DIR = ROOT / "apps/worker"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
+
+import rule_lexicon  # noqa: E402
+
+
+class RuleLexiconTest(unittest.TestCase):
+    def test_scan_groups_lemmas_by_category(self) -> None:
+        hits = rule_lexicon.scan_classification_lemmas(["今日", "確認", " TODO ", "無関係"])
+        self.assertEqual(hits["journal"], {"今日"})
+        self.assertEqual(hits["task"], {"確認", "todo"})
+        self.assertIn(rule_lexicon.TIME_HINT_GROUP, hits)
+        self.assertIn(rule_lexicon.ACTION_HINT_GROUP, hits)
+        self.assertNotIn("learning", hits)
+
+    def test_scan_matches_fullwidth_and_halfwidth_forms(self) -> None:
+        self.assertEqual(rule_lexicon.normalize_for_match(" ＴＯＤＯ "), "todo")
+        self.assertEqual(rule_lexicon.normalize_for_match("ﾃｽﾄ"), "テスト")
+        hits = rule_lexicon.scan_classification_lemmas(["ＴＯＤＯ"])
+        self.assertEqual(hits["task"], {"todo"})
+
+    def test_scan_without_hits_is_empty(self) -> None:
+        self.assertEqual(rule_lexicon.scan_classification_lemmas(["", "無関係"]), {})
+
+    def test_lemma_predicate_uses_declaration_order(self) -> None:
+        self.assertEqual(rule_lexicon.lemma_predicate("ﾃｽﾄ"), "tested")
+        self.assertEqual(rule_lexicon.lemma_predicate(" Learn "), "learned")
+        self.assertIsNone(rule_lexicon.lemma_predicate("無関係"))
+        for predicate, hints in rule_lexicon.NORMALIZED_PREDICATE_HINTS.items():
+            for lemma in hints:
+                owner = rule_lexicon.LEMMA_TO_PREDICATE[lemma]
+                self.assertLessEqual(
+                    rule_lexicon.PREDICATE_PRIORITY[owner], rule_lexicon.PREDICATE_PRIORITY[predicate]
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,38 +1,32 @@
-import subprocess
+import os
+import sys
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
-ROOT = Path("/Users/takahashikanato/brain-dock")
-PROCESS_CAPTURES = ROOT / "apps/worker/process_captures.py"
-EXTRACT_KEY_FACTS = ROOT / "apps/worker/extract_key_facts.py"
+ROOT = Path(__file__).resolve().parents[1]
+WORKER_DIR = ROOT / "apps/worker"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
+
+import extract_key_facts  # noqa: E402
+import process_captures  # noqa: E402
 
 
 class WorkerNeonBackendTest(unittest.TestCase):
-    def run_cmd(self, *cmd: str) -> subprocess.CompletedProcess[str]:
-        return subprocess.run(
-            list(cmd),
-            cwd=ROOT,
-            capture_output=True,
-            text=True,
-        )
+    def assert_requires_neon_dsn(self, main, *args: str) -> None:
+        env = {k: v for k, v in os.environ.items() if k != "NEON_DATABASE_URL"}
+        with mock.patch.dict(os.environ, env, clear=True), self.assertRaises(SystemExit) as ctx:
+            main(list(args))
+        self.assertIn("--neon-dsn is required", str(ctx.exception.code))
 
     def test_process_captures_requires_neon_dsn(self) -> None:
-        result = self.run_cmd(
-            "python3",
-            str(PROCESS_CAPTURES),
-            "--backend",
-            "neon",
-            "--limit",
-            "1",
-        )
-        self.assertNotEqual(result.returncode, 0)
-        self.assertIn("--neon-dsn is required", result.stderr)
+        self.assert_requires_neon_dsn(process_captures.main, "--backend", "neon", "--limit", "1")
 
     def test_extract_key_facts_requires_neon_dsn(self) -> None:
-        result = self.run_cmd(
-            "python3",
-            str(EXTRACT_KEY_FACTS),
+        self.assert_requires_neon_dsn(
+            extract_key_facts.main,
             "--backend",
             "neon",
             "--source",
@@ -40,8 +34,6 @@ class WorkerNeonBackendTest(unittest.TestCase):
             "--limit",
             "1",
         )
-        self.assertNotEqual(result.returncode, 0)
-        self.assertIn("--neon-dsn is required", result.stderr)
 
 
 if __name__ == "__main__":